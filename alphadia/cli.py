@@ -13,7 +13,7 @@ logger = logging.getLogger()
 
 # alphadia imports
 import alphadia
-from alphadia.workflow import reporting
+from alphadia.workflow.config import YamlLoader
 from alphadia import utils
 
 
@@ -121,7 +121,7 @@ def parse_config(args: argparse.Namespace) -> dict:
     config = {}
     if args.config is not None:
         with open(args.config, "r") as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=YamlLoader)
 
     try:
         utils.recursive_update(config, json.loads(args.config_dict))
@@ -306,6 +306,8 @@ def run(*args, **kwargs):
         print("No output directory specified.")
         return
 
+    from alphadia.workflow import reporting
+
     reporting.init_logging(output_directory)
     raw_path_list = parse_raw_path_list(args, config)
 
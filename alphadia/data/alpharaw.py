@@ -239,13 +239,17 @@ def calculate_valid_scans(quad_slices: np.ndarray, cycle: np.ndarray):
         raise ValueError("cycle must be of shape (1, n_precursor, 1, 2)")
 
     flat_cycle = cycle.reshape(-1, 2)
-    precursor_idx_list = []
+
+    # preallocate for the worst case instead of growing a list
+    precursor_idx_list = np.empty(len(flat_cycle), dtype=np.int64)
+    n_precursor_idx = 0
 
     for i, (mz_start, mz_stop) in enumerate(flat_cycle):
         if (quad_slices[0, 0] <= mz_stop) and (quad_slices[0, 1] >= mz_start):
-            precursor_idx_list.append(i)
+            precursor_idx_list[n_precursor_idx] = i
+            n_precursor_idx += 1
 
-    return np.array(precursor_idx_list)
+    return precursor_idx_list[:n_precursor_idx]
 
 
 class AlphaRaw(alpharawthermo.MSData_Base):
@@ -412,6 +416,7 @@ class Thermo(AlphaRaw, alpharawthermo.ThermoRawData):
         ("intensity_values", nb.core.types.float32[::1]),
         ("scan_max_index", nb.core.types.int64),
         ("frame_max_index", nb.core.types.int64),
+        ("ms1_precursor_idx_list", nb.core.types.int64[::1]),
     ]
 )
 class AlphaRawJIT(object):
@@ -457,6 +462,30 @@ class AlphaRawJIT(object):
         self.scan_max_index = scan_max_index
         self.frame_max_index = frame_max_index
 
+        self.ms1_precursor_idx_list = calculate_valid_scans(
+            np.array([[-1.0, -1.0]], dtype=np.float32), cycle
+        )
+
+    def get_valid_scans(self, quadrupole_mz: np.ndarray):
+        """Get the precursor index of all scans within the quadrupole window.
+        The scans of the [-1, -1] window used for precursor queries are precomputed in __init__.
+
+        Parameters
+        ----------
+
+        quadrupole_mz : np.ndarray, shape = (1,2,)
+            array of quadrupole m/z values
+
+        Returns
+        -------
+
+        np.ndarray, shape = (n_precursor_indices,)
+            array of precursor indices
+        """
+        if quadrupole_mz[0, 0] == -1.0 and quadrupole_mz[0, 1] == -1.0:
+            return self.ms1_precursor_idx_list
+        return calculate_valid_scans(quadrupole_mz, self.cycle)
+
     def get_frame_indices(self, rt_values: np.array, optimize_size: int = 16):
         """
 
@@ -613,7 +642,7 @@ class AlphaRawJIT(object):
         cycle_length = self.cycle.shape[1]
 
         # (n_precursors) array of precursor indices, the precursor index refers to each scan within the cycle
-        precursor_idx_list = calculate_valid_scans(quadrupole_mz, self.cycle)
+        precursor_idx_list = self.get_valid_scans(quadrupole_mz)
         n_precursor_indices = len(precursor_idx_list)
 
         precursor_cycle_start = frame_limits[0, 0] // cycle_length
@@ -738,7 +767,7 @@ class AlphaRawJIT(object):
         cycle_length = self.cycle.shape[1]
 
         # (n_precursors) array of precursor indices, the precursor index refers to each scan within the cycle
-        precursor_idx_list = calculate_valid_scans(quadrupole_mz, self.cycle)
+        precursor_idx_list = self.get_valid_scans(quadrupole_mz)
         # n_precursor_indices = len(precursor_idx_list)
 
         precursor_cycle_start = frame_limits[0, 0] // cycle_length
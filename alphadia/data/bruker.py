@@ -104,22 +104,33 @@ class TimsTOFTranspose(alphatims.bruker.TimsTOF):
             return
 
         logger.info("Transposing detector events")
-        push_indices, tof_indptr, intensity_values = transpose(
-            self._tof_indices, self._push_indptr, self._intensity_values
-        )
+        if self.mmap_detector_events:
+            # write the transposed events directly into temporary mmap arrays instead of cloning in-memory results
+            tof_indptr = tm.clone(transpose_indptr(self._tof_indices))
+            push_indices = tm.empty(self._tof_indices.shape, dtype=np.uint32)
+            intensity_values = tm.empty(
+                self._intensity_values.shape, dtype=self._intensity_values.dtype
+            )
+            transpose_values(
+                self._tof_indices,
+                self._push_indptr,
+                self._intensity_values,
+                tof_indptr,
+                push_indices,
+                intensity_values,
+            )
+        else:
+            push_indices, tof_indptr, intensity_values = transpose(
+                self._tof_indices, self._push_indptr, self._intensity_values
+            )
         logger.info("Finished transposing data")
 
         self._tof_indices = np.zeros(1, np.uint32)
         self._push_indptr = np.zeros(1, np.int64)
 
-        if self.mmap_detector_events:
-            self._push_indices = tm.clone(push_indices)
-            self._tof_indptr = tm.clone(tof_indptr)
-            self._intensity_values = tm.clone(intensity_values)
-        else:
-            self._push_indices = push_indices
-            self._tof_indptr = tof_indptr
-            self._intensity_values = intensity_values
+        self._push_indices = push_indices
+        self._tof_indptr = tof_indptr
+        self._intensity_values = intensity_values
 
     def _import_data_from_hdf_file(
         self,
@@ -166,6 +177,55 @@ class TimsTOFTranspose(alphatims.bruker.TimsTOF):
         )
 
 
+@nb.njit(inline="always")
+def gallop_left(array, left, value):
+    """Find the first index >= left at which `value` could be inserted into the sorted `array`.
+
+    The search range is doubled starting from `left` before the insertion point is bisected.
+    This is faster than a linear scan if the insertion point is far away and as fast if it is close.
+
+    Parameters
+    ----------
+
+    array : np.ndarray
+        sorted array
+
+    left : int
+        index to start the search from
+
+    value : int
+        value to search for
+
+    Returns
+    -------
+
+    int
+        first index i >= left with array[i] >= value, len(array) if there is none
+    """
+    n = len(array)
+    if left >= n or array[left] >= value:
+        return left
+
+    # array[lower] < value is guaranteed, the insertion point lies within (lower, upper]
+    lower = left
+    step = 1
+    upper = lower + 1
+    while upper < n and array[upper] < value:
+        lower = upper
+        step *= 2
+        upper = lower + step
+
+    left = lower + 1
+    right = min(upper, n)
+    while left < right:
+        mid = (left + right) >> 1
+        if array[mid] < value:
+            left = mid + 1
+        else:
+            right = mid
+    return left
+
+
 @jitclass(
     [
         ("accumulation_times", types.float64[:]),
@@ -198,6 +258,7 @@ class TimsTOFTranspose(alphatims.bruker.TimsTOF):
         ("tof_indptr", types.int64[::1]),
         ("intensity_values", types.uint16[::1]),
         ("has_mobility", types.boolean),
+        ("ms1_cycle_mask", types.boolean[:, ::1]),
     ]
 )
 class TimsTOFTransposeJIT(object):
@@ -285,6 +346,10 @@ class TimsTOFTransposeJIT(object):
 
         self.has_mobility = True
 
+        self.ms1_cycle_mask = self.calculate_cycle_mask(
+            np.array([[-1.0, -1.0]]), self.cycle.reshape(-1, 2)
+        )
+
     def get_frame_indices(self, rt_values: np.array, optimize_size: int = 16):
         """
 
@@ -480,9 +545,14 @@ class TimsTOFTransposeJIT(object):
             The DIA cycle quadrupole mask for each score group. (n_score_groups, n_frames * n_scans)
         """
 
-        n_score_groups = quad_slices.shape[0]
-
         if custom_cycle is None:
+            if (
+                quad_slices.shape[0] == 1
+                and quad_slices[0, 0] == -1.0
+                and quad_slices[0, 1] == -1.0
+            ):
+                # every precursor query uses the [-1, -1] window, its mask is computed once in __init__
+                return self.ms1_cycle_mask
             dia_mz_cycle = self.cycle.reshape(-1, 2)
 
         else:
@@ -490,11 +560,14 @@ class TimsTOFTransposeJIT(object):
                 raise ValueError("custom_cycle must be a 4d array")
             dia_mz_cycle = custom_cycle.reshape(-1, 2)
 
-        mz_mask = np.zeros((n_score_groups, len(dia_mz_cycle)), dtype=np.bool_)
-        for i, (mz_start, mz_stop) in enumerate(dia_mz_cycle):
-            for j, (quad_mz_start, quad_mz_stop) in enumerate(quad_slices):
-                if (quad_mz_start <= mz_stop) and (quad_mz_stop >= mz_start):
-                    mz_mask[j, i] = True
+        return self.calculate_cycle_mask(quad_slices, dia_mz_cycle)
+
+    def calculate_cycle_mask(self, quad_slices: np.ndarray, dia_mz_cycle: np.ndarray):
+        """Calculate the quadrupole mask of the flattened DIA mz cycle. (n_score_groups, n_frames * n_scans)"""
+        # interval overlap of every score group with every scan as a single fused broadcast
+        mz_mask = (quad_slices[:, 0:1] <= dia_mz_cycle[:, 1]) & (
+            quad_slices[:, 1:2] >= dia_mz_cycle[:, 0]
+        )
 
         return mz_mask
 
@@ -505,13 +578,35 @@ class TimsTOFTransposeJIT(object):
         cycle_mask,
     ):
         n_score_groups = cycle_mask.shape[0]
-
-        push_indices = []
-        absolute_precursor_cycle = []
         len_dia_mz_cycle = len(self.dia_mz_cycle)
 
+        # number of score groups selecting each scan of the dia mz cycle
+        n_selected = np.zeros(len_dia_mz_cycle, dtype=np.int64)
+        for i in range(n_score_groups):
+            for j in range(len_dia_mz_cycle):
+                if cycle_mask[i, j]:
+                    n_selected[j] += 1
+
         frame_start, frame_stop, frame_step = frame_limits[0]
         scan_start, scan_stop, scan_step = scan_limits[0]
+
+        # the output size is counted first so the push indices can be written into preallocated arrays
+        n_push_indices = 0
+        for frame_index in range(frame_start, frame_stop, frame_step):
+            for scan_index in range(scan_start, scan_stop, scan_step):
+                push_index = frame_index * self.scan_max_index + scan_index
+                # subtract a whole frame if the first frame is zero
+                if self.zeroth_frame:
+                    cyclic_push_index = push_index - self.scan_max_index
+                else:
+                    cyclic_push_index = push_index
+
+                n_push_indices += n_selected[cyclic_push_index % len_dia_mz_cycle]
+
+        push_indices = np.empty(n_push_indices, dtype=np.uint32)
+        absolute_precursor_cycle = np.empty(n_push_indices, dtype=np.int64)
+
+        k = 0
         for frame_index in range(frame_start, frame_stop, frame_step):
             for scan_index in range(scan_start, scan_stop, scan_step):
                 push_index = frame_index * self.scan_max_index + scan_index
@@ -525,15 +620,13 @@ class TimsTOFTransposeJIT(object):
                 scan_in_dia_mz_cycle = cyclic_push_index % len_dia_mz_cycle
 
                 # check fragment push indices
-                for i in range(n_score_groups):
-                    if cycle_mask[i, scan_in_dia_mz_cycle]:
-                        precursor_cycle = self.dia_precursor_cycle[scan_in_dia_mz_cycle]
-                        absolute_precursor_cycle.append(precursor_cycle)
-                        push_indices.append(push_index)
-
-        return np.array(push_indices, dtype=np.uint32), np.array(
-            absolute_precursor_cycle, dtype=np.int64
-        )
+                precursor_cycle = self.dia_precursor_cycle[scan_in_dia_mz_cycle]
+                for _ in range(n_selected[scan_in_dia_mz_cycle]):
+                    absolute_precursor_cycle[k] = precursor_cycle
+                    push_indices[k] = push_index
+                    k += 1
+
+        return push_indices, absolute_precursor_cycle
 
     def assemble_push(
         self,
@@ -552,14 +645,11 @@ class TimsTOFTransposeJIT(object):
             )
 
         unique_precursor_index = np.unique(precursor_index)
-        precursor_index_reverse = np.zeros(
-            np.max(unique_precursor_index) + 1, dtype=np.uint8
-        )
-        precursor_index_reverse[unique_precursor_index] = np.arange(
-            len(unique_precursor_index)
-        )
 
-        relative_precursor_index = precursor_index_reverse[precursor_index]
+        # position of each precursor index within the sorted unique precursor indices
+        relative_precursor_index = np.searchsorted(
+            unique_precursor_index, precursor_index
+        )
 
         n_precursor_indices = len(unique_precursor_index)
         n_tof_slices = len(tof_limits)
@@ -588,29 +678,43 @@ class TimsTOFTransposeJIT(object):
         else:
             dense_output[1, :, :, :, :] = ppm_background
 
+        # loop invariant attributes are read into locals once
+        push_indices = self.push_indices
+        tof_indptr = self.tof_indptr
+        intensity_values = self.intensity_values
+        tof_mz_values = self.mz_values
+        scan_max_index = self.scan_max_index
+        zeroth_frame = self.zeroth_frame
+        cycle_length = self.cycle.shape[1]
+
         for j, (tof_start, tof_stop, tof_step) in enumerate(tof_limits):
             library_mz_value = mz_values[j]
 
             for tof_index in range(tof_start, tof_stop, tof_step):
-                measured_mz_value = self.mz_values[tof_index]
+                measured_mz_value = tof_mz_values[tof_index]
 
-                start = self.tof_indptr[tof_index]
-                stop = self.tof_indptr[tof_index + 1]
+                # the mass error only depends on the tof index and is shared by all pushes
+                new_error = (
+                    (measured_mz_value - library_mz_value) / library_mz_value * 10**6
+                )
+
+                start = tof_indptr[tof_index]
+                stop = tof_indptr[tof_index + 1]
 
                 i = 0
                 idx = int(start)
 
                 while (idx < stop) and (i < len(push_query)):
-                    if push_query[i] < self.push_indices[idx]:
-                        i += 1
+                    if push_query[i] < push_indices[idx]:
+                        i = gallop_left(push_query, i, push_indices[idx])
 
                     else:
-                        if push_query[i] == self.push_indices[idx]:
-                            frame_index = self.push_indices[idx] // self.scan_max_index
-                            scan_index = self.push_indices[idx] % self.scan_max_index
+                        if push_query[i] == push_indices[idx]:
+                            frame_index = push_indices[idx] // scan_max_index
+                            scan_index = push_indices[idx] % scan_max_index
                             precursor_cycle_index = (
-                                frame_index - self.zeroth_frame
-                            ) // self.cycle.shape[1]
+                                frame_index - zeroth_frame
+                            ) // cycle_length
 
                             relative_scan = scan_index - mobility_start
                             relative_precursor = (
@@ -632,7 +736,7 @@ class TimsTOFTransposeJIT(object):
                                 relative_precursor,
                             ]
 
-                            new_intensity = self.intensity_values[idx]
+                            new_intensity = intensity_values[idx]
 
                             if absolute_masses:
                                 new_dim1 = (
@@ -641,11 +745,6 @@ class TimsTOFTransposeJIT(object):
                                 ) / (accumulated_intensity + new_intensity)
 
                             else:
-                                new_error = (
-                                    (measured_mz_value - library_mz_value)
-                                    / library_mz_value
-                                    * 10**6
-                                )
                                 new_dim1 = (
                                     accumulated_dim1 * accumulated_intensity
                                     + new_intensity * new_error
@@ -686,14 +785,11 @@ class TimsTOFTransposeJIT(object):
             )
 
         unique_precursor_index = np.unique(precursor_index)
-        precursor_index_reverse = np.zeros(
-            np.max(unique_precursor_index) + 1, dtype=np.uint8
-        )
-        precursor_index_reverse[unique_precursor_index] = np.arange(
-            len(unique_precursor_index)
-        )
 
-        relative_precursor_index = precursor_index_reverse[precursor_index]
+        # position of each precursor index within the sorted unique precursor indices
+        relative_precursor_index = np.searchsorted(
+            unique_precursor_index, precursor_index
+        )
 
         n_precursor_indices = len(unique_precursor_index)
         n_tof_slices = len(tof_limits)
@@ -717,25 +813,32 @@ class TimsTOFTransposeJIT(object):
             dtype=np.float32,
         )
 
+        push_indices = self.push_indices
+        tof_indptr = self.tof_indptr
+        intensity_values = self.intensity_values
+        scan_max_index = self.scan_max_index
+        zeroth_frame = self.zeroth_frame
+        cycle_length = self.cycle.shape[1]
+
         for j, (tof_start, tof_stop, tof_step) in enumerate(tof_limits):
             for tof_index in range(tof_start, tof_stop, tof_step):
-                start = self.tof_indptr[tof_index]
-                stop = self.tof_indptr[tof_index + 1]
+                start = tof_indptr[tof_index]
+                stop = tof_indptr[tof_index + 1]
 
                 i = 0
                 idx = int(start)
 
                 while (idx < stop) and (i < len(push_query)):
-                    if push_query[i] < self.push_indices[idx]:
-                        i += 1
+                    if push_query[i] < push_indices[idx]:
+                        i = gallop_left(push_query, i, push_indices[idx])
 
                     else:
-                        if push_query[i] == self.push_indices[idx]:
-                            frame_index = self.push_indices[idx] // self.scan_max_index
-                            scan_index = self.push_indices[idx] % self.scan_max_index
+                        if push_query[i] == push_indices[idx]:
+                            frame_index = push_indices[idx] // scan_max_index
+                            scan_index = push_indices[idx] % scan_max_index
                             precursor_cycle_index = (
-                                frame_index - self.zeroth_frame
-                            ) // self.cycle.shape[1]
+                                frame_index - zeroth_frame
+                            ) // cycle_length
 
                             relative_scan = scan_index - mobility_start
                             relative_precursor = (
@@ -747,7 +850,7 @@ class TimsTOFTransposeJIT(object):
                                 j,
                                 relative_scan,
                                 relative_precursor,
-                            ] += self.intensity_values[idx]
+                            ] += intensity_values[idx]
 
                         idx = idx + 1
 
@@ -899,6 +1002,22 @@ def transpose(tof_indices, push_indptr, values):
         values (n_values)
 
     """
+    tof_indptr = transpose_indptr(tof_indices)
+
+    # get new values
+    push_indices = np.zeros((len(tof_indices)), dtype=np.uint32)
+    new_values = np.zeros_like(values)
+
+    transpose_values(
+        tof_indices, push_indptr, values, tof_indptr, push_indices, new_values
+    )
+
+    return push_indices, tof_indptr, new_values
+
+
+@nb.njit
+def transpose_indptr(tof_indices):
+    """Start stop values of the transposed rows, one row per tof index (n_tof_indices + 1)."""
     # this is one less than the old col count or the new row count
     max_tof_index = tof_indices.max()
 
@@ -914,11 +1033,17 @@ def transpose(tof_indices, push_indptr, values):
     for i in range(max_tof_index + 1):
         tof_indptr[i + 1] = tof_indptr[i] + tof_indcount[i]
 
-    tof_indcount = np.zeros((max_tof_index + 1), dtype=np.uint32)
+    return tof_indptr
 
-    # get new values
-    push_indices = np.zeros((len(tof_indices)), dtype=np.uint32)
-    new_values = np.zeros_like(values)
+
+@nb.njit
+def transpose_values(
+    tof_indices, push_indptr, values, tof_indptr, push_indices, new_values
+):
+    """Fill the preallocated row indices and values (n_values) of the transposed data."""
+    max_tof_index = len(tof_indptr) - 2
+
+    tof_indcount = np.zeros((max_tof_index + 1), dtype=np.uint32)
 
     chunks = build_chunks(max_tof_index + 1, 20)
 
@@ -936,5 +1061,3 @@ def transpose(tof_indices, push_indptr, values):
             new_values,
             tof_indcount,
         )
-
-    return push_indices, tof_indptr, new_values
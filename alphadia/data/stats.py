@@ -19,8 +19,9 @@ def log_stats(rt_values: np.array, cycle: np.array):
 
     logger.info(f"============ Raw file stats ============")
 
-    rt_limits = rt_values.min() / 60, rt_values.max() / 60
-    rt_duration_sec = rt_values.max() - rt_values.min()
+    rt_min, rt_max = rt_values.min(), rt_values.max()
+    rt_limits = rt_min / 60, rt_max / 60
+    rt_duration_sec = rt_max - rt_min
     rt_duration_min = rt_duration_sec / 60
 
     logger.info(f"{'RT (min)':<20}: {rt_limits[0]:.1f} - {rt_limits[1]:.1f}")
@@ -35,8 +36,7 @@ def log_stats(rt_values: np.array, cycle: np.array):
     logger.info(f"{'Cycle len (sec)':<20}: {cycle_duration:.2f}")
     logger.info(f"{'Number of cycles':<20}: {cycle_number:.0f}")
 
-    flat_cycle = cycle.flatten()
-    flat_cycle = flat_cycle[flat_cycle > 0]
+    flat_cycle = cycle[cycle > 0]
     msms_range = flat_cycle.min(), flat_cycle.max()
 
     logger.info(f"{'MS2 range (m/z)':<20}: {msms_range[0]:.1f} - {msms_range[1]:.1f}")
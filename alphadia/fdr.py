@@ -198,11 +198,15 @@ def keep_best(
     pd.DataFrame
         The dataframe containing the best PSM for each group.
     """
-    temp_df = df.reset_index(drop=True)
+    # rank only the score and group columns and gather the full rows once
+    temp_df = df[group_columns + [score_column]].reset_index(drop=True)
     temp_df = temp_df.sort_values(score_column, ascending=True)
-    temp_df = temp_df.groupby(group_columns).head(1)
-    temp_df = temp_df.sort_index().reset_index(drop=True)
-    return temp_df
+    best_idx = np.sort(temp_df.groupby(group_columns).head(1).index.values)
+
+    # take does not mark the result as a copy of df, unlike iloc, so columns can be assigned without a warning
+    best_df = df.take(best_idx)
+    best_df.index = pd.RangeIndex(len(best_df))
+    return best_df
 
 
 def fdr_to_q_values(fdr_values: np.ndarray):
@@ -372,6 +372,37 @@ def center_envelope_1d(x):
             ) * 0.5
 
 
+@nb.njit
+def weighted_sum_a0(array, weights):
+    """
+    takes an array of shape (a, b, c) and weights of shape (a)
+    and returns an array of shape (b, c) where each element is the weighted sum along the first axis.
+    The sum is accumulated element-wise into the output without any temporary arrays.
+    The output has the dtype of `array`.
+
+    Parameters
+    ----------
+
+    array: np.ndarray
+        array of shape (a, b, c)
+
+    weights: np.ndarray
+        array of shape (a)
+
+    Returns
+    -------
+    np.ndarray
+        array of shape (b, c)
+    """
+    output = np.zeros((array.shape[1], array.shape[2]), dtype=array.dtype)
+    for i in range(array.shape[0]):
+        weight = weights[i]
+        for j in range(array.shape[1]):
+            for k in range(array.shape[2]):
+                output[j, k] += array[i, j, k] * weight
+    return output
+
+
 @nb.njit
 def weighted_mean_a1(array, weight_mask):
     """
@@ -972,9 +1003,8 @@ def fragment_mobility_correlation(
     )
 
     # (n_fragments, n_fragments)
-    fragment_scan_correlation_maked_reduced = np.sum(
-        fragment_scan_correlation_masked * observation_importance.reshape(-1, 1, 1),
-        axis=0,
+    fragment_scan_correlation_maked_reduced = weighted_sum_a0(
+        fragment_scan_correlation_masked, observation_importance
     )
     fragment_scan_correlation_list = np.dot(
         fragment_scan_correlation_maked_reduced, non_zero_fragment_norm
@@ -1034,9 +1064,8 @@ def profile_features(
     # print('fragment_frame_correlation_masked', fragment_frame_correlation_masked)
 
     # (n_fragments, n_fragments)
-    fragment_frame_correlation_maked_reduced = np.sum(
-        fragment_frame_correlation_masked * observation_importance.reshape(-1, 1, 1),
-        axis=0,
+    fragment_frame_correlation_maked_reduced = weighted_sum_a0(
+        fragment_frame_correlation_masked, observation_importance
     )
     fragment_frame_correlation_list = np.dot(
         fragment_frame_correlation_maked_reduced, fragment_intensity
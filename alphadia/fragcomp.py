@@ -182,7 +182,7 @@ class FragmentCompetition(object):
             return psm_df
 
         frag_df["frag_idx"] = np.arange(len(frag_df))
-        index_df = frag_df.groupby("_candidate_idx", as_index=False).agg(
+        index_df = frag_df.groupby("_candidate_idx", as_index=False, sort=False).agg(
             _frag_start_idx=pd.NamedAgg("frag_idx", min),
             _frag_stop_idx=pd.NamedAgg("frag_idx", max),
         )
@@ -664,13 +664,19 @@ class InitFlatColumns(ProcessingStep):
             (precursor_columns, input.precursor_df),
             (fragment_columns, input.fragment_df),
         ]:
+            available_columns = set(df.columns)
+            rename_dict = {}
             for key, value in column_mapping.items():
                 for candidate_columns in value:
-                    if candidate_columns in df.columns:
-                        df.rename(columns={candidate_columns: key}, inplace=True)
+                    if candidate_columns in available_columns:
+                        if candidate_columns != key:
+                            rename_dict[candidate_columns] = key
                         # break after first match
                         break
 
+            # rename all matched columns at once instead of rebuilding the index per column
+            df.rename(columns=rename_dict, inplace=True)
+
         if "mobility_library" not in input.precursor_df.columns:
             input.precursor_df["mobility_library"] = 0
             logger.warning("Library contains no ion mobility annotations")
@@ -697,15 +703,15 @@ class LogFlatLibraryStats(ProcessingStep):
         logger.info(f"Number of precursors: {len(input.precursor_df):,}")
 
         if "decoy" in input.precursor_df.columns:
-            n_targets = len(input.precursor_df.query("decoy == False"))
-            n_decoys = len(input.precursor_df.query("decoy == True"))
+            n_decoys = np.count_nonzero(input.precursor_df["decoy"].values)
+            n_targets = len(input.precursor_df) - n_decoys
             logger.info(f"\tthereof targets:{n_targets:,}")
             logger.info(f"\tthereof decoys: {n_decoys:,}")
         else:
             logger.warning("no decoy column was found")
 
         if "elution_group_idx" in input.precursor_df.columns:
-            n_elution_groups = len(input.precursor_df["elution_group_idx"].unique())
+            n_elution_groups = input.precursor_df["elution_group_idx"].nunique()
             average_precursors_per_group = len(input.precursor_df) / n_elution_groups
             logger.info(f"Number of elution groups: {n_elution_groups:,}")
             logger.info(f"\taverage size: {average_precursors_per_group:.2f}")
@@ -714,7 +720,7 @@ class LogFlatLibraryStats(ProcessingStep):
             logger.warning("no elution_group_idx column was found")
 
         if "proteins" in input.precursor_df.columns:
-            n_proteins = len(input.precursor_df["proteins"].unique())
+            n_proteins = input.precursor_df["proteins"].nunique()
             logger.info(f"Number of proteins: {n_proteins:,}")
         else:
             logger.warning("no proteins column was found")
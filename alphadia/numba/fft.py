@@ -21,12 +21,13 @@ class NumbaContextOnly(Exception):
 def rfft2(x: np.array, s: Union[None, tuple] = None) -> np.array:
     """
     Numba function to compute the 2D real-to-complex FFT of a real array.
+    For arrays with more than two dimensions, the FFT is computed over the last two axes in a single batched call.
 
     Parameters
     ----------
 
     x : np.ndarray
-        dtype = np.float32, ndim = 2, containing the input data.
+        dtype = np.float32, ndim >= 2, containing the input data.
 
     s : Union[None, tuple]
         Tuple of integers containing the shape of the output array.
@@ -35,7 +36,7 @@ def rfft2(x: np.array, s: Union[None, tuple] = None) -> np.array:
     -------
 
     np.ndarray
-        dtype = np.complex64, ndim = 2, containing the 2D real-to-complex FFT of the input array.
+        dtype = np.complex64, ndim >= 2, containing the 2D real-to-complex FFT of the input array.
 
     .. note::
         This function should only be used in a numba context as it relies on numba overloads.
@@ -51,7 +52,7 @@ def _(x, s=None):
     if not isinstance(x, nb.types.Array):
         return
 
-    if x.ndim != 2:
+    if x.ndim < 2:
         return
 
     if x.dtype != nb.types.float32:
@@ -72,12 +73,13 @@ def _(x, s=None):
 def irfft2(x: np.array, s: Union[None, tuple] = None) -> np.array:
     """
     Numba function to compute the 2D complex-to-real FFT of a complex array.
+    For arrays with more than two dimensions, the FFT is computed over the last two axes in a single batched call.
 
     Parameters
     ----------
 
     x : np.ndarray
-        dtype = np.complex64, ndim = 2, containing the input data.
+        dtype = np.complex64, ndim >= 2, containing the input data.
 
     s : Union[None, tuple]
         Tuple of integers containing the shape of the output array.
@@ -86,7 +88,7 @@ def irfft2(x: np.array, s: Union[None, tuple] = None) -> np.array:
     -------
 
     np.ndarray
-        dtype = np.float32, ndim = 2, containing the 2D complex-to-real FFT of the input array.
+        dtype = np.float32, ndim >= 2, containing the 2D complex-to-real FFT of the input array.
 
     .. note::
         This function should only be used in a numba context as it relies on numba overloads.
@@ -102,7 +104,7 @@ def _(x, s=None):
     if not isinstance(x, nb.types.Array):
         return
 
-    if x.ndim != 2:
+    if x.ndim < 2:
         return
 
     if x.dtype != nb.types.complex64:
@@ -133,7 +135,7 @@ def roll(a, delta0, delta1):
     return b
 
 
-def convolve_fourier(dense, kernel):
+def convolve_fourier(dense, kernel, fourier_filter=None):
     """
     Numba helper function to apply a gaussian filter to a 2d or 3d dense matrix.
 
@@ -147,6 +149,11 @@ def convolve_fourier(dense, kernel):
     kernel : np.ndarray
         Array of shape (i, j)
 
+    fourier_filter : np.ndarray, optional
+        Precomputed real-to-complex FFT of the kernel as returned by `rfft2(kernel, dense.shape[-2:])`.
+        Can be passed to reuse the transformed kernel for multiple dense matrices of the same shape.
+        If None, the kernel will be transformed on every call.
+
     Returns
     -------
 
@@ -161,7 +168,7 @@ def convolve_fourier(dense, kernel):
 
 
 @overload(convolve_fourier, fastmath=True)
-def _(dense, kernel):
+def _(dense, kernel, fourier_filter=None):
     if not isinstance(dense, nb.types.Array):
         return
 
@@ -174,61 +181,118 @@ def _(dense, kernel):
     if dense.ndim < 2:
         return
 
-    if dense.ndim == 2:
+    # all layers are transformed at once as rfft2 and irfft2 operate on the last two axes
+    def funcx_impl(dense, kernel, fourier_filter=None):
+        k0, k1 = kernel.shape
+        delta0, delta1 = -k0 // 2, -k1 // 2
+
+        s0, s1 = dense.shape[-2], dense.shape[-1]
+        n_layers = dense.size // (s0 * s1)
+        layers = np.ascontiguousarray(dense).reshape((n_layers, s0, s1))
 
-        def funcx_impl(dense, kernel):
-            k0, k1 = kernel.shape
-            delta0, delta1 = -k0 // 2, -k1 // 2
+        out = np.zeros((n_layers, s0, s1), dtype=dense.dtype)
 
-            out = np.zeros_like(dense)
-            fourier_filter = rfft2(kernel, dense.shape)
-            layer = irfft2(rfft2(dense) * fourier_filter)
-            out[delta0:, delta1:] = layer[:-delta0, :-delta1]
-            out[:delta0, delta1:] = layer[-delta0:, :-delta1]
-            out[delta0:, :delta1] = layer[:-delta0, -delta1:]
-            out[:delta0, :delta1] = layer[-delta0:, -delta1:]
+        # layers without any signal stay zero and are not transformed
+        nonzero_idx = np.zeros(n_layers, dtype=np.int64)
+        n_nonzero = 0
+        for i in range(n_layers):
+            if np.any(layers[i]):
+                nonzero_idx[n_nonzero] = i
+                n_nonzero += 1
 
-            return out
+        if n_nonzero == 0:
+            return out.reshape(dense.shape)
 
-        return funcx_impl
+        if n_nonzero < n_layers:
+            layers = layers[nonzero_idx[:n_nonzero]]
 
-    if dense.ndim == 3:
+        if fourier_filter is None:
+            kernel_fourier = rfft2(kernel, dense.shape[-2:])
+        else:
+            kernel_fourier = fourier_filter
 
-        def funcx_impl(dense, kernel):
-            k0, k1 = kernel.shape
-            delta0, delta1 = -k0 // 2, -k1 // 2
+        layer = irfft2(rfft2(layers) * kernel_fourier)
+        rolled = np.empty((n_nonzero, s0, s1), dtype=dense.dtype)
+        rolled[..., delta0:, delta1:] = layer[..., :-delta0, :-delta1]
+        rolled[..., :delta0, delta1:] = layer[..., -delta0:, :-delta1]
+        rolled[..., delta0:, :delta1] = layer[..., :-delta0, -delta1:]
+        rolled[..., :delta0, :delta1] = layer[..., -delta0:, -delta1:]
 
-            out = np.zeros_like(dense)
-            fourier_filter = rfft2(kernel, dense.shape[-2:])
+        for j in range(n_nonzero):
+            out[nonzero_idx[j]] = rolled[j]
 
-            for i in range(dense.shape[0]):
-                layer = irfft2(rfft2(dense[i]) * fourier_filter)
-                out[i, delta0:, delta1:] = layer[:-delta0, :-delta1]
-                out[i, :delta0, delta1:] = layer[-delta0:, :-delta1]
-                out[i, delta0:, :delta1] = layer[:-delta0, -delta1:]
-                out[i, :delta0, :delta1] = layer[-delta0:, -delta1:]
+        return out.reshape(dense.shape)
 
-            return out
+    return funcx_impl
 
-        return funcx_impl
 
-    if dense.ndim == 4:
+@nb.njit(fastmath=True)
+def convolve_separable(dense, kernel_0, kernel_1):
+    """
+    Numba helper function to apply a separable filter to a dense matrix of two or more dimensions.
+    The filter is applied as a direct convolution along the last two axes.
+    Edges are wrapped around and the output is aligned in the same way as in `convolve_fourier`,
+    so that both functions yield the same result for `kernel = np.outer(kernel_0, kernel_1)`.
 
-        def funcx_impl(dense, kernel):
-            k0, k1 = kernel.shape
-            delta0, delta1 = -k0 // 2, -k1 // 2
+    Parameters
+    ----------
 
-            out = np.zeros_like(dense)
-            fourier_filter = rfft2(kernel, dense.shape[-2:])
+    dense : np.ndarray
+        Array of shape (..., n_scans, n_frames)
 
-            for i in range(dense.shape[0]):
-                for j in range(dense.shape[1]):
-                    layer = irfft2(rfft2(dense[i, j]) * fourier_filter)
-                    out[i, j, delta0:, delta1:] = layer[:-delta0, :-delta1]
-                    out[i, j, :delta0, delta1:] = layer[-delta0:, :-delta1]
-                    out[i, j, delta0:, :delta1] = layer[:-delta0, -delta1:]
-                    out[i, j, :delta0, :delta1] = layer[-delta0:, -delta1:]
+    kernel_0 : np.ndarray
+        Array of shape (i,) containing the kernel along the scan dimension.
 
-            return out
+    kernel_1 : np.ndarray
+        Array of shape (j,) containing the kernel along the frame dimension.
 
-        return funcx_impl
+    Returns
+    -------
+
+    np.ndarray
+        Array of shape (..., n_scans, n_frames) containing the filtered dense stack.
+
+    """
+    s0, s1 = dense.shape[-2], dense.shape[-1]
+    n_layers = dense.size // (s0 * s1)
+    layers = np.ascontiguousarray(dense).reshape((n_layers, s0, s1))
+
+    # kernels larger than the dense matrix are cropped
+    k0 = min(len(kernel_0), s0)
+    k1 = min(len(kernel_1), s1)
+    offset_0 = (len(kernel_0) + 1) // 2 - k0 + 1
+    offset_1 = (len(kernel_1) + 1) // 2 - k1 + 1
+    kernel_0_reversed = kernel_0[:k0][::-1].astype(np.float32)
+    kernel_1_reversed = kernel_1[:k1][::-1].astype(np.float32)
+
+    # wrapped copies of the input so that the inner loops do not need modulo indexing
+    padded_1 = np.empty((s0, s1 + k1 - 1), dtype=np.float32)
+    padded_0 = np.empty((s0 + k0 - 1, s1), dtype=np.float32)
+    intermediate = np.empty((s0, s1), dtype=np.float32)
+
+    out = np.zeros((n_layers, s0, s1), dtype=np.float32)
+    for i in range(n_layers):
+        # layers without any signal stay zero
+        if not np.any(layers[i]):
+            continue
+
+        for t in range(s1 + k1 - 1):
+            padded_1[:, t] = layers[i, :, (t + offset_1) % s1]
+
+        intermediate[:] = 0
+        for m in range(k1):
+            weight = kernel_1_reversed[m]
+            for y in range(s0):
+                for x in range(s1):
+                    intermediate[y, x] += weight * padded_1[y, x + m]
+
+        for t in range(s0 + k0 - 1):
+            padded_0[t] = intermediate[(t + offset_0) % s0]
+
+        for m in range(k0):
+            weight = kernel_0_reversed[m]
+            for y in range(s0):
+                for x in range(s1):
+                    out[i, y, x] += weight * padded_0[y + m, x]
+
+    return out.reshape(dense.shape)
@@ -59,6 +59,16 @@ class FragmentContainer:
         """
         Sort the fragments in-place by m/z
         """
+        # fragments are often already ordered, reordering all columns can then be skipped
+        is_sorted = True
+        for i in range(1, len(self.mz)):
+            if self.mz[i] < self.mz[i - 1]:
+                is_sorted = False
+                break
+
+        if is_sorted:
+            return
+
         mz_order = np.argsort(self.mz)
         self.precursor_idx = self.precursor_idx[mz_order]
         self.mz_library = self.mz_library[mz_order]
@@ -146,100 +156,45 @@ def slice(inst, slices):
     if inst is FragmentContainer.class_type.instance_type:
 
         def impl(inst, slices):
-            precursor_idx = []
-            fragments_mz_library = []
-            fragments_mz = []
-            fragments_intensity = []
-            fragments_type = []
-            fragments_loss_type = []
-            fragments_charge = []
-            fragments_number = []
-            fragments_position = []
-            fragments_cardinality = []
-
-            precursor = np.arange(len(slices), dtype=np.uint32)
-
-            for i, (start_idx, stop_idx, step) in enumerate(slices):
-                for j in range(start_idx, stop_idx):
-                    precursor_idx.append(precursor[i])
-                    fragments_mz_library.append(inst.mz_library[j])
-                    fragments_mz.append(inst.mz[j])
-                    fragments_intensity.append(inst.intensity[j])
-                    fragments_type.append(inst.type[j])
-                    fragments_loss_type.append(inst.loss_type[j])
-                    fragments_charge.append(inst.charge[j])
-                    fragments_number.append(inst.number[j])
-                    fragments_position.append(inst.position[j])
-                    fragments_cardinality.append(inst.cardinality[j])
-
-            precursor_idx = np.array(precursor_idx, dtype=np.uint32)
-            fragments_mz_library = np.array(fragments_mz_library, dtype=np.float32)
-            fragment_mz = np.array(fragments_mz, dtype=np.float32)
-            fragment_intensity = np.array(fragments_intensity, dtype=np.float32)
-            fragment_type = np.array(fragments_type, dtype=np.uint8)
-            fragment_loss_type = np.array(fragments_loss_type, dtype=np.uint8)
-            fragment_charge = np.array(fragments_charge, dtype=np.uint8)
-            fragment_number = np.array(fragments_number, dtype=np.uint8)
-            fragment_position = np.array(fragments_position, dtype=np.uint8)
-            fragment_cardinality = np.array(fragments_cardinality, dtype=np.uint8)
-
-            f = FragmentContainer(
-                fragments_mz_library,
-                fragment_mz,
-                fragment_intensity,
-                fragment_type,
-                fragment_loss_type,
-                fragment_charge,
-                fragment_number,
-                fragment_position,
-                fragment_cardinality,
-            )
-
-            f.precursor_idx = precursor_idx
-
-            return f
+            return slice_manual(inst, slices)
 
         return impl
 
 
 @nb.njit()
 def slice_manual(inst, slices):
-    precursor_idx = []
-    fragments_mz_library = []
-    fragments_mz = []
-    fragments_intensity = []
-    fragments_type = []
-    fragments_loss_type = []
-    fragments_charge = []
-    fragments_number = []
-    fragments_position = []
-    fragments_cardinality = []
-
-    precursor = np.arange(len(slices), dtype=np.uint32)
-
+    # the number of fragments is known from the slices,
+    # so all output arrays are preallocated and filled in a single pass
+    n_fragments = 0
+    for start_idx, stop_idx, step in slices:
+        if stop_idx > start_idx:
+            n_fragments += stop_idx - start_idx
+
+    precursor_idx = np.empty(n_fragments, dtype=np.uint32)
+    fragments_mz_library = np.empty(n_fragments, dtype=np.float32)
+    fragment_mz = np.empty(n_fragments, dtype=np.float32)
+    fragment_intensity = np.empty(n_fragments, dtype=np.float32)
+    fragment_type = np.empty(n_fragments, dtype=np.uint8)
+    fragment_loss_type = np.empty(n_fragments, dtype=np.uint8)
+    fragment_charge = np.empty(n_fragments, dtype=np.uint8)
+    fragment_number = np.empty(n_fragments, dtype=np.uint8)
+    fragment_position = np.empty(n_fragments, dtype=np.uint8)
+    fragment_cardinality = np.empty(n_fragments, dtype=np.uint8)
+
+    k = 0
     for i, (start_idx, stop_idx, step) in enumerate(slices):
         for j in range(start_idx, stop_idx):
-            precursor_idx.append(precursor[i])
-            fragments_mz_library.append(inst.mz_library[j])
-            fragments_mz.append(inst.mz[j])
-            fragments_intensity.append(inst.intensity[j])
-            fragments_type.append(inst.type[j])
-            fragments_loss_type.append(inst.loss_type[j])
-            fragments_charge.append(inst.charge[j])
-            fragments_number.append(inst.number[j])
-            fragments_position.append(inst.position[j])
-            fragments_cardinality.append(inst.cardinality[j])
-
-    precursor_idx = np.array(precursor_idx, dtype=np.uint32)
-    fragments_mz_library = np.array(fragments_mz_library, dtype=np.float32)
-    fragment_mz = np.array(fragments_mz, dtype=np.float32)
-    fragment_intensity = np.array(fragments_intensity, dtype=np.float32)
-    fragment_type = np.array(fragments_type, dtype=np.uint8)
-    fragment_loss_type = np.array(fragments_loss_type, dtype=np.uint8)
-    fragment_charge = np.array(fragments_charge, dtype=np.uint8)
-    fragment_number = np.array(fragments_number, dtype=np.uint8)
-    fragment_position = np.array(fragments_position, dtype=np.uint8)
-    fragment_cardinality = np.array(fragments_cardinality, dtype=np.uint8)
+            precursor_idx[k] = i
+            fragments_mz_library[k] = inst.mz_library[j]
+            fragment_mz[k] = inst.mz[j]
+            fragment_intensity[k] = inst.intensity[j]
+            fragment_type[k] = inst.type[j]
+            fragment_loss_type[k] = inst.loss_type[j]
+            fragment_charge[k] = inst.charge[j]
+            fragment_number[k] = inst.number[j]
+            fragment_position[k] = inst.position[j]
+            fragment_cardinality[k] = inst.cardinality[j]
+            k += 1
 
     f = FragmentContainer(
         fragments_mz_library,
@@ -355,9 +310,11 @@ def get_ion_group_mapping(
     if np.max(score_group_intensity) > 0:
         score_group_intensity /= score_group_intensity.max()
 
-    indices = np.argsort(score_group_intensity)[::-1][
-        : min(top_k, len(score_group_intensity))
-    ]
+    # the groups are already ordered by m/z, sorting is only needed if groups have to be dropped
+    if len(score_group_intensity) <= top_k:
+        return grouped_mz, score_group_intensity
+
+    indices = np.argsort(score_group_intensity)[::-1][:top_k]
     indices = np.sort(indices)
 
     grouped_mz = grouped_mz[indices]
@@ -29,7 +29,6 @@ import numpy as np
 import os
 import multiprocessing
 import threading
-from tqdm import tqdm
 
 from alphabase.spectral_library import base
 from alphabase.spectral_library.flat import SpecLibFlat
@@ -48,32 +47,36 @@ class SpecLibFlatFromOutput(SpecLibFlat):
         """
         Calculate the position of the fragments based on the type and number of the fragment.
         """
-        # Fragtypes from ascii to char
-        available_frag_types = self._fragment_df["type"].unique()
-        self.frag_types_as_char = {i: chr(i) for i in available_frag_types}
+        # Fragtypes are stored as ascii codes
+        fragment_type = self._fragment_df["type"].values
+        a_b_c_fragments = np.isin(fragment_type, [ord(c) for c in "abc"])
+        x_y_z_fragments = np.isin(fragment_type, [ord(c) for c in "xyz"])
 
-        mapped_frag_types = self._fragment_df["type"].map(self.frag_types_as_char)
-        a_b_c_fragments = mapped_frag_types.isin(["a", "b", "c"])
-        x_y_z_fragments = mapped_frag_types.isin(["x", "y", "z"])
+        if "position" in self._fragment_df.columns:
+            position = self._fragment_df["position"].values.astype(np.float64)
+        else:
+            position = np.full(len(self._fragment_df), np.nan)
+        fragment_number = self._fragment_df["number"].values
 
+        # For X,Y,Z frags calculate the position as being the nAA of the precursor - number of the fragment
         precursor_idx_to_nAA = (
             self._precursor_df[["precursor_idx", "nAA"]]
             .set_index("precursor_idx")
             .to_dict()["nAA"]
         )
-        # For X,Y,Z frags calculate the position as being the nAA of the precursor - number of the fragment
-        x_y_z_number = (
-            self._fragment_df.loc[x_y_z_fragments, "precursor_idx"].map(
-                precursor_idx_to_nAA
-            )
-            - self._fragment_df.loc[x_y_z_fragments, "number"]
+        x_y_z_nAA = (
+            pd.Series(self._fragment_df["precursor_idx"].values[x_y_z_fragments])
+            .map(precursor_idx_to_nAA)
+            .values
+        )
+        position[x_y_z_fragments] = (
+            x_y_z_nAA - fragment_number[x_y_z_fragments].astype(np.int64) - 1
         )
-        self._fragment_df.loc[x_y_z_fragments, "position"] = x_y_z_number - 1
 
         # For A,B,C frags calculate the position as being the number of the fragment
-        self._fragment_df.loc[a_b_c_fragments, "position"] = (
-            self._fragment_df.loc[a_b_c_fragments, "number"] - 1
-        )
+        position[a_b_c_fragments] = fragment_number[a_b_c_fragments] - 1
+
+        self._fragment_df["position"] = position
 
         # Change position to int
         self._fragment_df["position"] = self._fragment_df["position"].astype(int)
@@ -130,18 +133,12 @@ class SpecLibFlatFromOutput(SpecLibFlat):
         ).issubset(
             psm_df.columns
         ), f"selected_precursor_columns must be a subset of psm_df.columns didnt find {set(selected_precursor_columns) - set(psm_df.columns)}"
-        psm_df = psm_df[selected_precursor_columns]
         # validate.precursors_flat_from_output(psm_df)
 
-        # remove decoy precursors
-        psm_df = psm_df[psm_df["decoy"] == 0]
-
-        self._precursor_df = pd.DataFrame()
-        for col in psm_df.columns:
-            self._precursor_df[col] = psm_df[col]
+        # select columns and remove decoy precursors in a single copy
+        psm_df = psm_df.loc[psm_df["decoy"] == 0, selected_precursor_columns]
 
-        self._precursor_df["decoy"] = self._precursor_df["decoy"].astype(int)
-        self._precursor_df = psm_df[psm_df["decoy"] == 0].reset_index(drop=True)
+        self._precursor_df = psm_df.reset_index(drop=True)
 
         # self._precursor_df.set_index('precursor_idx', inplace=True)
         # Change the data type of the mods column to string
@@ -168,7 +165,9 @@ class SpecLibFlatFromOutput(SpecLibFlat):
 
         # ----------------- Fragment -----------------
         # Filer fragments that are not used in the precursors
-        frag_df = frag_df[frag_df["precursor_idx"].isin(self._precursor_df["precursor_idx"])]
+        frag_df = frag_df[
+            frag_df["precursor_idx"].isin(self._precursor_df["precursor_idx"])
+        ]
         self._fragment_df = frag_df[
             ["mz", "intensity", "precursor_idx", "frag_idx", "correlation"]
         ].copy()
@@ -317,7 +316,7 @@ def _get_top_indices_from_freq(
     i = 0
     for n in number_of_readings_per_precursor:
         to_keep = min(n, keep_top)
-        indices[i : i + to_keep] = np.ones(to_keep, dtype=np.bool_)
+        indices[i : i + to_keep] = True
         i += n
 
     return indices
@@ -507,6 +506,67 @@ def normalize_rt_delta_max(spec_lib_base: base.SpecLibBase) -> base.SpecLibBase:
     return spec_lib_base
 
 
+@nb.jit(nopython=True)
+def _ms2_quality_control(
+    frag_start_idx: np.ndarray,
+    frag_stop_idx: np.ndarray,
+    fragment_correlation: np.ndarray,
+    fragment_intensity: np.ndarray,
+    precursor_correlation_cutoff: float,
+    fragment_correlation_ratio: float,
+):
+    """
+    Numba implementation of the per precursor quality control in `ms2_quality_control`.
+
+    Parameters
+    ----------
+    frag_start_idx : np.ndarray
+        The start index of the fragments for each precursor.
+    frag_stop_idx : np.ndarray
+        The stop index of the fragments for each precursor.
+    fragment_correlation : np.ndarray
+        The fragment correlation matrix.
+    fragment_intensity : np.ndarray
+        The fragment intensity matrix, fragments below the correlation cutoff are set to zero in place.
+    precursor_correlation_cutoff : float
+        Only precursors with a median fragment correlation above this cutoff will be used for MS2 learning.
+    fragment_correlation_ratio : float
+        The cutoff for the fragment correlation relative to the median fragment correlation for a precursor.
+
+    Returns
+    -------
+    np.array
+        Boolean array indicating which precursors should be used for MS2 learning.
+    """
+    use_for_ms2 = np.zeros(len(frag_start_idx), dtype=np.bool_)
+
+    for i in range(len(frag_start_idx)):
+        start_idx = frag_start_idx[i]
+        stop_idx = frag_stop_idx[i]
+
+        # get XIC correlations and intensities for the precursor
+        flat_correlation = fragment_correlation[start_idx:stop_idx].flatten()
+        flat_intensity = fragment_intensity[start_idx:stop_idx].flatten()
+
+        # calculate the median correlation for the precursor
+        observed_correlation = flat_correlation[flat_intensity > 0.0]
+        if len(observed_correlation) == 0 or np.isnan(observed_correlation).any():
+            median_correlation = np.nan
+        else:
+            median_correlation = np.median(observed_correlation)
+
+        # use the precursor for MS2 learning if the median correlation is above the cutoff
+        use_for_ms2[i] = median_correlation > precursor_correlation_cutoff
+
+        correlation_cutoff = median_correlation * fragment_correlation_ratio
+        for j in range(start_idx, stop_idx):
+            for k in range(fragment_intensity.shape[1]):
+                if not fragment_correlation[j, k] > correlation_cutoff:
+                    fragment_intensity[j, k] = 0
+
+    return use_for_ms2
+
+
 def ms2_quality_control(
     spec_lib_base: base.SpecLibBase,
     precursor_correlation_cutoff: float = 0.5,
@@ -535,32 +595,20 @@ def ms2_quality_control(
         control filters.
     """
 
-    use_for_ms2 = np.zeros(len(spec_lib_base.precursor_df), dtype=bool)
-
     precursor_df = spec_lib_base.precursor_df
     fragment_intensity_df = spec_lib_base.fragment_intensity_df
     fragment_correlation_df = spec_lib_base._fragment_correlation_df
 
-    for i, (start_idx, stop_idx) in tqdm(
-        enumerate(zip(precursor_df["frag_start_idx"], precursor_df["frag_stop_idx"]))
-    ):
-        # get XIC correlations and intensities for the precursor
-        fragment_correlation_view = fragment_correlation_df.iloc[start_idx:stop_idx]
-        flat_correlation = fragment_correlation_view.values.flatten()
-
-        fragment_intensity_view = fragment_intensity_df.iloc[start_idx:stop_idx]
-        flat_intensity = fragment_intensity_view.values.flatten()
-
-        # calculate the median correlation for the precursor
-        intensity_mask = flat_intensity > 0.0
-        median_correlation = np.median(flat_correlation[intensity_mask])
-
-        # use the precursor for MS2 learning if the median correlation is above the cutoff
-        use_for_ms2[i] = median_correlation > precursor_correlation_cutoff
-
-        fragment_intensity_view[:] = fragment_intensity_view * (
-            fragment_correlation_view > median_correlation * fragment_correlation_ratio
-        )
+    fragment_intensity = fragment_intensity_df.values
+    use_for_ms2 = _ms2_quality_control(
+        precursor_df["frag_start_idx"].values,
+        precursor_df["frag_stop_idx"].values,
+        fragment_correlation_df.values,
+        fragment_intensity,
+        precursor_correlation_cutoff,
+        fragment_correlation_ratio,
+    )
+    fragment_intensity_df[:] = fragment_intensity
 
     spec_lib_base.precursor_df["use_for_ms2"] = use_for_ms2
 
@@ -75,6 +75,10 @@ class QuantBuilder:
         self.psm_df = psm_df
         self.column = column
 
+        # precursors repeat across runs, so the fragments of every run are
+        # filtered against the unique precursor indices instead of the full psm_df
+        self.precursor_idx = psm_df["precursor_idx"].unique()
+
     def accumulate_frag_df_from_folders(
         self, folder_list: List[str]
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
@@ -125,7 +129,9 @@ class QuantBuilder:
             logger.warning(f"no frag file found for {raw_name}")
             return
 
-        df = prepare_df(df, self.psm_df, column=self.column)
+        df = prepare_df(
+            df, self.psm_df, column=self.column, precursor_idx=self.precursor_idx
+        )
 
         intensity_df = df[["precursor_idx", "ion", self.column]].copy()
         intensity_df.rename(columns={self.column: raw_name}, inplace=True)
@@ -135,7 +141,9 @@ class QuantBuilder:
 
         df_list = []
         for raw_name, df in df_iterable:
-            df = prepare_df(df, self.psm_df, column=self.column)
+            df = prepare_df(
+                df, self.psm_df, column=self.column, precursor_idx=self.precursor_idx
+            )
 
             intensity_df = intensity_df.merge(
                 df[["ion", self.column, "precursor_idx"]],
@@ -159,9 +167,9 @@ class QuantBuilder:
         quality_df["precursor_idx"] = quality_df["precursor_idx"].astype(np.uint32)
 
         # annotate protein group
-        annotate_df = self.psm_df.groupby("precursor_idx", as_index=False).agg(
-            {"pg": "first", "mod_seq_hash": "first", "mod_seq_charge_hash": "first"}
-        )
+        annotate_df = self.psm_df.groupby(
+            "precursor_idx", as_index=False, sort=False
+        ).agg({"pg": "first", "mod_seq_hash": "first", "mod_seq_charge_hash": "first"})
 
         intensity_df = intensity_df.merge(annotate_df, on="precursor_idx", how="left")
         quality_df = quality_df.merge(annotate_df, on="precursor_idx", how="left")
@@ -290,8 +298,10 @@ class QuantBuilder:
         return protein_df
 
 
-def prepare_df(df, psm_df, column="intensity"):
-    df = df[df["precursor_idx"].isin(psm_df["precursor_idx"])].copy()
+def prepare_df(df, psm_df, column="intensity", precursor_idx=None):
+    if precursor_idx is None:
+        precursor_idx = psm_df["precursor_idx"]
+    df = df[df["precursor_idx"].isin(precursor_idx)].copy()
     df["ion"] = utils.ion_hash(
         df["precursor_idx"].values,
         df["number"].values,
@@ -663,12 +673,17 @@ class SearchPlanOutput:
             psm_df = self.load_precursor_table()
         psm_df = psm_df[psm_df["decoy"] == 0]
 
+        # split the precursor table by run once instead of masking it per folder
+        run_df_dict = dict(list(psm_df.groupby("run", sort=False)))
+
         stat_df_list = []
         for folder in folder_list:
             raw_name = os.path.basename(folder)
             stat_df_list.append(
                 _build_run_stat_df(
-                    raw_name, psm_df[psm_df["run"] == raw_name], all_channels
+                    raw_name,
+                    run_df_dict.get(raw_name, psm_df.iloc[:0]),
+                    all_channels,
                 )
             )
 
@@ -883,23 +898,36 @@ def _build_run_stat_df(raw_name: str, run_df: pd.DataFrame, channels: List[int]
 def perform_protein_fdr(psm_df):
     """Perform protein FDR on PSM dataframe"""
 
-    protein_features = []
-    for _, group in psm_df.groupby(["pg", "decoy"]):
-        protein_features.append(
-            {
-                "pg": group["pg"].iloc[0],
-                "genes": group["genes"].iloc[0],
-                "proteins": group["proteins"].iloc[0],
-                "decoy": group["decoy"].iloc[0],
-                "count": len(group),
-                "n_precursor": len(group["precursor_idx"].unique()),
-                "n_peptides": len(group["sequence"].unique()),
-                "n_runs": len(group["run"].unique()),
-                "mean_score": group["proba"].mean(),
-                "best_score": group["proba"].min(),
-                "worst_score": group["proba"].max(),
-            }
+    group_keys = ["pg", "decoy"]
+    grouped = psm_df.groupby(group_keys)
+
+    protein_features = (
+        grouped.agg(
+            count=("precursor_idx", "size"),
+            mean_score=("proba", "mean"),
+            best_score=("proba", "min"),
+            worst_score=("proba", "max"),
+        )
+        # missing values count as one distinct value, as with len(unique())
+        .join(
+            grouped[["precursor_idx", "sequence", "run"]]
+            .nunique(dropna=False)
+            .rename(
+                columns={
+                    "precursor_idx": "n_precursor",
+                    "sequence": "n_peptides",
+                    "run": "n_runs",
+                }
+            )
+        )
+        # take genes and proteins from the first row even if they are missing
+        .join(
+            psm_df.drop_duplicates(group_keys).set_index(group_keys)[
+                ["genes", "proteins"]
+            ]
         )
+        .reset_index()
+    )
 
     feature_columns = [
         "count",
@@ -911,8 +939,6 @@ def perform_protein_fdr(psm_df):
         "worst_score",
     ]
 
-    protein_features = pd.DataFrame(protein_features)
-
     X = protein_features[feature_columns].values
     y = protein_features["decoy"].values
 
@@ -200,13 +200,39 @@ class GaussianKernel:
 
         return self.gaussian_kernel_2d(
             self.kernel_width, self.kernel_height, rt_sigma, mobility_sigma
-        ).astype(np.float32)
+        )
+
+    @staticmethod
+    def gaussian_kernel_1d(size: int, sigma: float):
+        """
+        Create one factor of the separable 2D gaussian kernel.
+
+        Parameters
+        ----------
+
+        size : int
+            Length of the kernel vector.
+
+        sigma : float
+            Spread of the gaussian kernel. As in :meth:`gaussian_kernel_2d`, it is used as the diagonal entry of the covariance matrix.
+
+        Returns
+        -------
+
+        weights : np.ndarray, dtype=np.float64
+            Unnormalized gaussian weights of shape (size,) evaluated at the indices [-size//2, ..., size//2 - 1].
+
+        """
+        i = np.arange(-size // 2, size // 2, dtype=np.float64)
+        return np.exp(-(i**2) / (2 * sigma))
 
     @staticmethod
     def gaussian_kernel_2d(size_x: int, size_y: int, sigma_x: float, sigma_y: float):
         """
         Create a 2D gaussian kernel with a given size and standard deviation.
 
+        As the covariance has no off-diagonal terms, the kernel is calculated as the outer product of two 1D kernels.
+
         Parameters
         ----------
 
@@ -226,17 +252,11 @@ class GaussianKernel:
             2D gaussian kernel matrix of shape (size, size).
 
         """
-        # create indicies [-2, -1, 0, 1 ...]
-        x, y = np.meshgrid(
-            np.arange(-size_x // 2, size_x // 2), np.arange(-size_y // 2, size_y // 2)
-        )
-        xy = np.column_stack((x.flatten(), y.flatten())).astype("float32")
-
-        # mean is always zero
-        mu = np.array([[0.0, 0.0]])
+        gx = GaussianKernel.gaussian_kernel_1d(size_x, sigma_x)
+        gy = GaussianKernel.gaussian_kernel_1d(size_y, sigma_y)
 
-        # sigma is set with no covariance
-        sigma_mat = np.array([[sigma_x, 0.0], [0.0, sigma_y]])
+        # the kernel is scaled by (2 pi)^(-1/2) / sqrt(sigma_x * sigma_y) rather than the (2 pi)^(-1) of a normalized 2D gaussian
+        # this prefactor is kept as it sets the magnitude of the smoothed intensities the candidate scores are computed from
+        norm = (2 * np.pi) ** (-1 / 2) / np.sqrt(sigma_x * sigma_y)
 
-        weights = multivariate_normal(xy, mu, sigma_mat)
-        return weights.reshape(size_y, size_x).astype(np.float32)
+        return np.outer(gy * norm, gx).astype(np.float32)
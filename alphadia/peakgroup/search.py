@@ -43,6 +43,7 @@ class HybridCandidateConfigJIT:
     top_k_fragments: nb.int64
     exclude_shared_ions: nb.types.bool_
     kernel_size: nb.int64
+    separable_convolution: nb.types.bool_
 
     f_mobility: nb.float64
     f_rt: nb.float64
@@ -79,6 +80,7 @@ class HybridCandidateConfigJIT:
         top_k_fragments,
         exclude_shared_ions,
         kernel_size,
+        separable_convolution,
         f_mobility,
         f_rt,
         center_fraction,
@@ -111,6 +113,7 @@ class HybridCandidateConfigJIT:
         self.top_k_fragments = top_k_fragments
         self.exclude_shared_ions = exclude_shared_ions
         self.kernel_size = kernel_size
+        self.separable_convolution = separable_convolution
 
         self.f_mobility = f_mobility
         self.f_rt = f_rt
@@ -156,6 +159,9 @@ class HybridCandidateConfig(config.JITConfig):
         self.exclude_shared_ions = True
         self.kernel_size = 30
 
+        # apply the kernel as two 1D convolutions instead of a fourier convolution
+        self.separable_convolution = False
+
         # parameters used during peak identification
         self.f_mobility = 1.0
         self.f_rt = 0.99
@@ -295,6 +301,10 @@ def _executor(
     fragment_container,
     config,
     kernel,
+    kernel_0,
+    kernel_1,
+    fourier_filter,
+    fourier_filter_shape,
     debug,
 ):
     select_candidates(
@@ -305,6 +315,10 @@ def _executor(
         fragment_container,
         config,
         kernel,
+        kernel_0,
+        kernel_1,
+        fourier_filter,
+        fourier_filter_shape,
         debug,
     )
 
@@ -318,6 +332,10 @@ def select_candidates(
     fragment_container,
     config,
     kernel,
+    kernel_0,
+    kernel_1,
+    fourier_filter,
+    fourier_filter_shape,
     debug,
 ):
     # prepare precursor isotope intensity
@@ -434,6 +452,10 @@ def select_candidates(
         isotope_intensity,
         fragment_container_slice.intensity,
         kernel,
+        kernel_0,
+        kernel_1,
+        fourier_filter,
+        fourier_filter_shape,
         jit_data,
         config,
         scan_limits,
@@ -446,7 +468,7 @@ def select_candidates(
     )
 
 
-@nb.njit(fastmath=True)
+@nb.njit(fastmath=True, cache=True)
 def build_features(smooth_precursor, smooth_fragment):
     n_features = 1
 
@@ -467,7 +489,7 @@ def build_features(smooth_precursor, smooth_fragment):
     return features
 
 
-@nb.njit
+@nb.njit(cache=True)
 def join_close_peaks(
     peak_scan_list, peak_cycle_list, peak_score_list, scan_tolerance, cycle_tolerance
 ):
@@ -523,7 +545,7 @@ def join_close_peaks(
     return peak_mask
 
 
-@nb.njit()
+@nb.njit(cache=True)
 def join_overlapping_candidates(
     scan_limits_list, cycle_limits_list, p_scan_overlap=0.01, p_cycle_overlap=0.6
 ):
@@ -603,6 +625,88 @@ def join_overlapping_candidates(
     return joined_mask
 
 
+@nb.njit()
+def reference_dense_shape(jit_data, rt, mobility, mz, config):
+    """
+    Determine the scan and cycle dimensions of a dense precursor matrix extracted with the given configuration.
+    As the frame limits are padded to a fixed number of cycles, the shape is the same for nearly all precursors.
+
+    Parameters
+    ----------
+
+    jit_data : alphadia.data.alpharaw.AlphaRawJIT or alphadia.data.bruker.TimsTOFTransposeJIT
+        raw data object
+
+    rt : float
+        retention time of the reference precursor
+
+    mobility : float
+        mobility of the reference precursor
+
+    mz : float
+        m/z of the reference precursor
+
+    config : HybridCandidateConfigJIT
+        candidate selection config
+
+    Returns
+    -------
+
+    tuple
+        (n_scans, n_cycles) of the dense precursor matrix
+    """
+    frame_limits = jit_data.get_frame_indices_tolerance(rt, config.rt_tolerance)
+    scan_limits = jit_data.get_scan_indices_tolerance(
+        mobility, config.mobility_tolerance
+    )
+    dense, _ = jit_data.get_dense_intensity(
+        frame_limits,
+        scan_limits,
+        np.array([mz], dtype=np.float32),
+        config.precursor_mz_tolerance,
+        np.array([[-1.0, -1.0]], dtype=np.float32),
+    )
+    return dense.shape[-2], dense.shape[-1]
+
+
+@nb.njit(cache=True)
+def build_fourier_filter(kernel, shape):
+    return fft.rfft2(kernel, shape)
+
+
+@nb.njit(cache=True)
+def select_fourier_filter(kernel, fourier_filter, fourier_filter_shape, shape):
+    """
+    Return the transformed kernel for a dense matrix with the given scan and cycle dimensions.
+    The precomputed `fourier_filter` is reused if `shape` matches `fourier_filter_shape`,
+    otherwise the kernel is transformed for `shape`.
+
+    Parameters
+    ----------
+
+    kernel : np.ndarray
+        Array of shape (i, j)
+
+    fourier_filter : np.ndarray
+        Precomputed filter as returned by `build_fourier_filter(kernel, fourier_filter_shape)`
+
+    fourier_filter_shape : tuple
+        Shape (n_scans, n_frames) `fourier_filter` has been built for
+
+    shape : tuple
+        Shape (n_scans, n_frames) of the dense matrix which should be convolved
+
+    Returns
+    -------
+
+    np.ndarray
+        Real-to-complex FFT of the kernel for `shape`
+    """
+    if shape == fourier_filter_shape:
+        return fourier_filter
+    return fft.rfft2(kernel, shape)
+
+
 @nb.njit(fastmath=True)
 def build_candidates(
     precursor_idx,
@@ -614,6 +718,10 @@ def build_candidates(
     precursor_intensity,
     fragment_intensity,
     kernel,
+    kernel_0,
+    kernel_1,
+    fourier_filter,
+    fourier_filter_shape,
     jit_data,
     config,
     scan_limits,
@@ -626,38 +734,55 @@ def build_candidates(
 ):
     cycle_length = jit_data.cycle.shape[1]
 
+    # normalization vectors are cast to float32 so the score plane is not promoted to float64
     if weights is None:
-        feature_weights = np.ones(1)
+        feature_weights = np.ones(1, dtype=np.float32)
     else:
-        feature_weights = weights
+        feature_weights = weights.astype(np.float32)
 
     feature_weights = feature_weights.reshape(-1, 1, 1)
 
-    smooth_precursor = fft.convolve_fourier(dense_precursors, kernel)
-    smooth_fragment = fft.convolve_fourier(dense_fragments, kernel)
+    # the separable direct convolution is opt-in, the fourier convolution is faster for the default kernel
+    if config.separable_convolution:
+        smooth_precursor = fft.convolve_separable(dense_precursors, kernel_0, kernel_1)
+        smooth_fragment = fft.convolve_separable(dense_fragments, kernel_0, kernel_1)
 
-    if not smooth_precursor.shape == dense_precursors.shape:
-        print(smooth_precursor.shape, dense_precursors.shape)
-        print("smooth_precursor shape does not match dense_precursors shape")
-    if not smooth_fragment.shape == dense_fragments.shape:
-        print(smooth_fragment.shape, dense_fragments.shape)
-        print("smooth_fragment shape does not match dense_fragments shape")
+    else:
+        precursor_fourier_filter = select_fourier_filter(
+            kernel, fourier_filter, fourier_filter_shape, dense_precursors.shape[-2:]
+        )
+        # precursor and fragment matrices usually share the same scan and cycle dimensions
+        # and the transformed kernel is reused, otherwise a second filter is built for the fragments
+        if dense_fragments.shape[-2:] == dense_precursors.shape[-2:]:
+            fragment_fourier_filter = precursor_fourier_filter
+        else:
+            fragment_fourier_filter = select_fourier_filter(
+                kernel, fourier_filter, fourier_filter_shape, dense_fragments.shape[-2:]
+            )
+
+        smooth_precursor = fft.convolve_fourier(
+            dense_precursors, kernel, precursor_fourier_filter
+        )
+        smooth_fragment = fft.convolve_fourier(
+            dense_fragments, kernel, fragment_fourier_filter
+        )
 
-    feature_matrix = build_features(smooth_precursor, smooth_fragment).astype("float32")
+    # build_features already returns float32, the convolutions preserve the input shape
+    feature_matrix = build_features(smooth_precursor, smooth_fragment)
 
     # get mean and std to normalize features
     # if trained, use the mean and std from training
     # otherwise calculate the mean and std from the current data
     if mean is None:
-        feature_mean = utils.amean1(feature_matrix).reshape(-1, 1, 1)
+        feature_mean = utils.amean1(feature_matrix).astype(np.float32).reshape(-1, 1, 1)
     else:
-        feature_mean = mean.reshape(-1, 1, 1)
+        feature_mean = mean.astype(np.float32).reshape(-1, 1, 1)
     # feature_mean = feature_mean.reshape(-1,1,1)
 
     if std is None:
-        feature_std = utils.astd1(feature_matrix).reshape(-1, 1, 1)
+        feature_std = utils.astd1(feature_matrix).astype(np.float32).reshape(-1, 1, 1)
     else:
-        feature_std = std.reshape(-1, 1, 1)
+        feature_std = std.astype(np.float32).reshape(-1, 1, 1)
     # feature_std = feature_std.reshape(-1,1,1)
 
     # make sure that mean, std and weights have the same shape
@@ -667,7 +792,9 @@ def build_candidates(
         )
 
     feature_matrix_norm = (
-        feature_weights * (feature_matrix - feature_mean) / (feature_std + 1e-6)
+        feature_weights
+        * (feature_matrix - feature_mean)
+        / (feature_std + np.float32(1e-6))
     )
 
     score = np.sum(feature_matrix_norm, axis=0)
@@ -744,8 +871,6 @@ def build_candidates(
         scan_limits_list,
         cycle_limits_list,
     ):
-        # does not work anymore
-
         scan_limits_absolute = numeric.wrap1(
             scan_limits_relative + scan_limits[0, 0], jit_data.scan_max_index
         )
@@ -842,6 +967,10 @@ class HybridCandidateSelection(object):
         )
         self.kernel = gaussian_filter.get_dense_matrix()
 
+        # the gaussian kernel is separable and equals the outer product of its normalized marginals
+        self.kernel_0 = self.kernel.sum(axis=1)
+        self.kernel_1 = self.kernel.sum(axis=0) / self.kernel.sum()
+
         self.available_isotopes = utils.get_isotope_columns(
             self.precursors_flat.columns
         )
@@ -879,6 +1008,8 @@ class HybridCandidateSelection(object):
         )
         thread_count = 1 if debug else thread_count
 
+        fourier_filter, fourier_filter_shape = self.assemble_fourier_filter()
+
         alphatims.utils.set_threads(thread_count)
 
         _executor(
@@ -889,11 +1020,54 @@ class HybridCandidateSelection(object):
             fragment_container,
             self.config,
             self.kernel,
+            self.kernel_0,
+            self.kernel_1,
+            fourier_filter,
+            fourier_filter_shape,
             debug,
         )
 
         return self.collect_candidates(candidate_container)
 
+    def assemble_fourier_filter(self):
+        """
+        Transform the convolution kernel once for the dense matrix shape shared by most precursors.
+        The shape is determined by extracting a reference precursor with median retention time, mobility and m/z.
+        Precursors with a different dense matrix shape transform the kernel themselves.
+
+        Returns
+        -------
+
+        fourier_filter : np.ndarray
+            real-to-complex FFT of the kernel
+
+        fourier_filter_shape : tuple
+            (n_scans, n_cycles) of the dense matrix the filter was computed for
+        """
+        if len(self.precursors_flat) == 0:
+            return np.zeros((1, 1), dtype=np.complex64), (0, 0)
+
+        fourier_filter_shape = reference_dense_shape(
+            self.dia_data,
+            np.float32(np.median(self.precursors_flat[self.rt_column].values)),
+            np.float32(np.median(self.precursors_flat[self.mobility_column].values)),
+            np.float32(
+                np.median(self.precursors_flat[self.precursor_mz_column].values)
+            ),
+            self.config,
+        )
+
+        if (
+            fourier_filter_shape[0] < self.kernel.shape[0]
+            or fourier_filter_shape[1] < self.kernel.shape[1]
+        ):
+            return np.zeros((1, 1), dtype=np.complex64), (0, 0)
+
+        return (
+            build_fourier_filter(self.kernel, fourier_filter_shape),
+            fourier_filter_shape,
+        )
+
     def collect_candidates(self, candidate_container):
         candidate_df = pd.DataFrame(
             {
@@ -914,21 +1088,18 @@ class HybridCandidateSelection(object):
                 )
             }
         )
-        candidate_df = candidate_df.merge(
-            self.precursors_flat[["precursor_idx", "elution_group_idx", "decoy"]],
-            on="precursor_idx",
-            how="left",
+        # precursors_flat is sorted by precursor_idx, a searchsorted gather replaces the hash merge
+        precursor_information = self.get_precursor_lookup(
+            candidate_df["precursor_idx"].values, ["elution_group_idx", "decoy"]
         )
+        for column, values in precursor_information.items():
+            candidate_df[column] = values
         return candidate_df
 
     def assemble_fragments(self):
         # set cardinality to 1 if not present
-        if "cardinality" in self.fragments_flat.columns:
-            self.fragments_flat["cardinality"] = self.fragments_flat[
-                "cardinality"
-            ].values
-
-        else:
+        # an existing column is left untouched, validation casts it only if the dtype differs
+        if "cardinality" not in self.fragments_flat.columns:
             logging.warning(
                 "Fragment cardinality column not found in fragment dataframe. Setting cardinality to 1."
             )
@@ -1067,6 +1238,35 @@ class HybridCandidateSelection(object):
 
         return candidate_df
 
+    def get_precursor_lookup(self, precursor_idx, columns):
+        """
+        Gather columns of the precursor dataframe for the given precursor indices.
+        `precursors_flat` is sorted by precursor_idx, so the rows are located with a single searchsorted.
+
+        Parameters
+        ----------
+        precursor_idx : np.ndarray
+            precursor indices to look up
+
+        columns : list of str
+            columns of `precursors_flat` to gather
+
+        Returns
+        -------
+        dict
+            dictionary mapping every column to an array with one value per precursor index
+        """
+
+        # precursor_flat_lookup has an element for every candidate and contains the index of the respective precursor
+        precursor_flat_lookup = np.searchsorted(
+            self.precursors_flat["precursor_idx"].values, precursor_idx, side="left"
+        )
+
+        return {
+            column: self.precursors_flat[column].values[precursor_flat_lookup]
+            for column in columns
+        }
+
     def append_precursor_information(self, df):
         """
         Append relevant precursor information to the candidates dataframe.
@@ -1082,45 +1282,28 @@ class HybridCandidateSelection(object):
             dataframe containing the extracted candidates with precursor information appended
         """
 
-        # precursor_flat_lookup has an element for every candidate and contains the index of the respective precursor
-        precursor_pidx = self.precursors_flat["precursor_idx"].values
-        candidate_pidx = df["precursor_idx"].values
-        precursor_flat_lookup = np.searchsorted(
-            precursor_pidx, candidate_pidx, side="left"
-        )
-
-        df["decoy"] = self.precursors_flat["decoy"].values[precursor_flat_lookup]
-
-        df["rt_library"] = self.precursors_flat["rt_library"].values[
-            precursor_flat_lookup
+        precursor_columns = [
+            "decoy",
+            "rt_library",
+            "mobility_library",
+            "flat_frag_start_idx",
+            "flat_frag_stop_idx",
+            "charge",
+            "proteins",
+            "genes",
         ]
         if self.rt_column == "rt_calibrated":
-            df["rt_calibrated"] = self.precursors_flat["rt_calibrated"].values[
-                precursor_flat_lookup
-            ]
-
-        df["mobility_library"] = self.precursors_flat["mobility_library"].values[
-            precursor_flat_lookup
-        ]
+            precursor_columns.append("rt_calibrated")
         if self.mobility_column == "mobility_calibrated":
-            df["mobility_calibrated"] = self.precursors_flat[
-                "mobility_calibrated"
-            ].values[precursor_flat_lookup]
-
-        df["flat_frag_start_idx"] = self.precursors_flat["flat_frag_start_idx"].values[
-            precursor_flat_lookup
-        ]
-        df["flat_frag_stop_idx"] = self.precursors_flat["flat_frag_stop_idx"].values[
-            precursor_flat_lookup
-        ]
-        df["charge"] = self.precursors_flat["charge"].values[precursor_flat_lookup]
-        df["proteins"] = self.precursors_flat["proteins"].values[precursor_flat_lookup]
-        df["genes"] = self.precursors_flat["genes"].values[precursor_flat_lookup]
+            precursor_columns.append("mobility_calibrated")
 
         available_isotopes = utils.get_isotope_columns(self.precursors_flat.columns)
-        available_isotope_columns = [f"i_{i}" for i in available_isotopes]
+        precursor_columns += [f"i_{i}" for i in available_isotopes]
 
-        for col in available_isotope_columns:
-            df[col] = self.precursors_flat[col].values[precursor_flat_lookup]
+        precursor_information = self.get_precursor_lookup(
+            df["precursor_idx"].values, precursor_columns
+        )
+        for column, values in precursor_information.items():
+            df[column] = values
 
         return df
@@ -29,10 +29,10 @@ def _(mono_mz, charge, isotope_intensity):
         return
 
     def funcx_impl(mono_mz, charge, isotope_intensity):
-        offset = np.arange(len(isotope_intensity)) * 1.0033548350700006 / charge
-        isotope_mz = np.zeros(len(isotope_intensity), dtype=np.float32)
-        isotope_mz[:] = mono_mz
-        isotope_mz += offset
+        isotope_mz = np.empty(len(isotope_intensity), dtype=np.float32)
+        mono_mz_32 = np.float32(mono_mz)
+        for i in range(len(isotope_intensity)):
+            isotope_mz[i] = mono_mz_32 + i * 1.0033548350700006 / charge
         return isotope_mz
 
     return funcx_impl
@@ -85,6 +85,7 @@ class Plan:
         logger.progress("")
 
         self.spectral_library = None
+        self._base_spec_lib = None
         self.raw_path_list = raw_path_list
         self.library_path = library_path
         self.fasta_path_list = fasta_path_list
@@ -250,6 +251,10 @@ class Plan:
         logger.info(f"Saving library to {library_path}")
         spectral_library.save_hdf(library_path)
 
+        if self.config["library_loading"]["keep_base_in_memory"]:
+            # the prepare pipeline modifies the library in place, so an independent copy is kept for the output step
+            self._base_spec_lib = spectral_library.copy()
+
         # 4. prepare library for search
         # This part is always performed, even if a fully compliant library is provided
         prepare_pipeline = libtransform.ProcessingPipeline(
@@ -363,10 +368,13 @@ class Plan:
                 raise e
 
         try:
-            base_spec_lib = SpecLibBase()
-            base_spec_lib.load_hdf(
-                os.path.join(self.output_folder, "speclib.hdf"), load_mod_seq=True
-            )
+            if self._base_spec_lib is not None:
+                base_spec_lib = self._base_spec_lib
+            else:
+                base_spec_lib = SpecLibBase()
+                base_spec_lib.load_hdf(
+                    os.path.join(self.output_folder, "speclib.hdf"), load_mod_seq=True
+                )
 
             output = outputtransform.SearchPlanOutput(self.config, self.output_folder)
             output.build(workflow_folder_list, base_spec_lib)
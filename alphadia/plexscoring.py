@@ -481,12 +481,12 @@ class Candidate:
         """
         n_isotopes = min(self.isotope_intensity.shape[0], config.top_k_isotopes)
         self.isotope_intensity = self.isotope_intensity[:n_isotopes]
-        offset = (
-            np.arange(self.isotope_intensity.shape[0])
-            * 1.0033548350700006
-            / self.charge
-        )
-        return offset.astype(nb.float32) + self.precursor_mz
+        isotope_mz = np.empty(n_isotopes, dtype=nb.float32)
+        for i in range(n_isotopes):
+            isotope_mz[i] = (
+                nb.float32(i * 1.0033548350700006 / self.charge) + self.precursor_mz
+            )
+        return isotope_mz
 
     def process(
         self,
@@ -581,17 +581,29 @@ class Candidate:
             ),
             dtype=np.float32,
         )
+        # the observation axis is reduced in the outer loop so that the inner loops run over contiguous memory
+        mass_sum = np.zeros(
+            (_dense_precursors.shape[3], _dense_precursors.shape[4]), dtype=np.float64
+        )
+        mass_count = np.zeros(
+            (_dense_precursors.shape[3], _dense_precursors.shape[4]), dtype=np.int64
+        )
         for i in range(_dense_precursors.shape[1]):
             dense_precursors[0, i, 0] = np.sum(_dense_precursors[0, i], axis=0)
+            mass_sum[:] = 0
+            mass_count[:] = 0
+            for j in range(_dense_precursors.shape[2]):
+                for k in range(_dense_precursors.shape[3]):
+                    for l in range(_dense_precursors.shape[4]):
+                        value = _dense_precursors[1, i, j, k, l]
+                        mass_sum[k, l] += value
+                        if value > 0:
+                            mass_count[k, l] += 1
             for k in range(_dense_precursors.shape[3]):
                 for l in range(_dense_precursors.shape[4]):
-                    sum = 0
-                    count = 0
-                    for j in range(_dense_precursors.shape[2]):
-                        sum += _dense_precursors[1, i, j, k, l]
-                        if _dense_precursors[1, i, j, k, l] > 0:
-                            count += 1
-                    dense_precursors[1, i, 0, k, l] = sum / (count + 1e-6)
+                    dense_precursors[1, i, 0, k, l] = mass_sum[k, l] / (
+                        mass_count[k, l] + 1e-6
+                    )
 
         # DEBUG only used for debugging
         # self.dense_precursors = dense_precursors
@@ -732,12 +744,10 @@ class Candidate:
         # store fragment features if requested
         # only target precursors are stored
         if config.collect_fragments:
-            psm_proto_df.fragment_precursor_idx[self.output_idx, : len(mz_observed)] = [
+            psm_proto_df.fragment_precursor_idx[self.output_idx, : len(mz_observed)] = (
                 self.precursor_idx
-            ] * len(mz_observed)
-            psm_proto_df.fragment_rank[self.output_idx, : len(mz_observed)] = [
-                self.rank
-            ] * len(mz_observed)
+            )
+            psm_proto_df.fragment_rank[self.output_idx, : len(mz_observed)] = self.rank
             psm_proto_df.fragment_mz_library[
                 self.output_idx, : len(fragments.mz_library)
             ] = fragments.mz_library
@@ -1036,6 +1046,18 @@ class ScoreGroupContainer:
         current_score_group_idx = -1
         current_precursor_idx = -1
 
+        # the number of score groups is known upfront as the candidates are sorted by score_group_idx
+        # the typed list is reserved once instead of growing with every appended score group
+        n_score_groups = 0
+        for idx in range(len(score_group_idx)):
+            if idx == 0 or score_group_idx[idx] != score_group_idx[idx - 1]:
+                n_score_groups += 1
+
+        if len(self.score_groups) == 0:
+            self.score_groups = nb.typed.List.empty_list(
+                score_group_type, allocated=n_score_groups
+            )
+
         # iterate over all candidates
         # whenever a new score group is encountered, create a new score group
         for idx in range(len(score_group_idx)):
@@ -1324,22 +1346,23 @@ class OuptutPsmDF:
         self.fragment_charge = np.zeros((n_psm, top_k_fragments), dtype=np.uint8)
 
     def to_fragment_df(self):
-        mask = self.fragment_mz_library.flatten() > 0
+        # the fragment arrays are C-contiguous, ravel returns a view instead of a copy
+        mask = self.fragment_mz_library.ravel() > 0
 
         return (
-            self.fragment_precursor_idx.flatten()[mask],
-            self.fragment_rank.flatten()[mask],
-            self.fragment_mz_library.flatten()[mask],
-            self.fragment_mz.flatten()[mask],
-            self.fragment_mz_observed.flatten()[mask],
-            self.fragment_height.flatten()[mask],
-            self.fragment_intensity.flatten()[mask],
-            self.fragment_mass_error.flatten()[mask],
-            self.fragment_correlation.flatten()[mask],
-            self.fragment_position.flatten()[mask],
-            self.fragment_number.flatten()[mask],
-            self.fragment_type.flatten()[mask],
-            self.fragment_charge.flatten()[mask],
+            self.fragment_precursor_idx.ravel()[mask],
+            self.fragment_rank.ravel()[mask],
+            self.fragment_mz_library.ravel()[mask],
+            self.fragment_mz.ravel()[mask],
+            self.fragment_mz_observed.ravel()[mask],
+            self.fragment_height.ravel()[mask],
+            self.fragment_intensity.ravel()[mask],
+            self.fragment_mass_error.ravel()[mask],
+            self.fragment_correlation.ravel()[mask],
+            self.fragment_position.ravel()[mask],
+            self.fragment_number.ravel()[mask],
+            self.fragment_type.ravel()[mask],
+            self.fragment_charge.ravel()[mask],
         )
 
     def to_precursor_df(self):
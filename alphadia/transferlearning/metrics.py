@@ -1,10 +1,93 @@
+import numba as nb
 import numpy as np
 import pandas as pd
 from typing import List
-from peptdeep.utils import linear_regression
 from peptdeep.model.ms2 import calc_ms2_similarity
 
 
+def _check_shapes(predictions: np.ndarray, targets: np.ndarray):
+    """Raise a ValueError if predictions and targets differ in shape, the numba kernels below do not check bounds."""
+    if predictions.shape != targets.shape:
+        raise ValueError(
+            f"predictions and targets must have the same shape, got {predictions.shape} and {targets.shape}"
+        )
+
+
+@nb.njit(cache=True)
+def _l1_loss(predictions, targets):
+    """Mean absolute error between two flat arrays in a single pass, NaN for empty input."""
+    if len(predictions) == 0:
+        return np.nan
+    error = 0.0
+    for i in range(len(predictions)):
+        error += abs(predictions[i] - targets[i])
+    return error / len(predictions)
+
+
+@nb.njit(cache=True)
+def _abs_error_percentile(predictions, targets, percentile):
+    """Percentile of the absolute error between two flat arrays, NaN for empty input."""
+    if len(predictions) == 0:
+        return np.nan
+    abs_error = np.empty(len(predictions), dtype=np.float64)
+    for i in range(len(predictions)):
+        abs_error[i] = abs(predictions[i] - targets[i])
+    return np.percentile(abs_error, percentile)
+
+
+@nb.njit(cache=True)
+def _ce_loss(predictions, targets):
+    """Mean categorical cross entropy over the rows of two 2D arrays in a single pass, NaN for empty input."""
+    if predictions.shape[0] == 0:
+        return np.nan
+    loss = 0.0
+    for i in range(predictions.shape[0]):
+        for j in range(predictions.shape[1]):
+            loss -= targets[i, j] * np.log(predictions[i, j])
+    return loss / predictions.shape[0]
+
+
+@nb.njit(cache=True)
+def _linear_regression(x, y):
+    """
+    Least squares fit of y on x, returns r squared, absolute r, slope and intercept.
+    Statistics which are undefined because x or y is constant or the input is empty are NaN.
+    """
+    n = len(x)
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan
+
+    x_mean = 0.0
+    y_mean = 0.0
+    for i in range(n):
+        x_mean += x[i]
+        y_mean += y[i]
+    x_mean /= n
+    y_mean /= n
+
+    sxx = 0.0
+    syy = 0.0
+    sxy = 0.0
+    for i in range(n):
+        dx = x[i] - x_mean
+        dy = y[i] - y_mean
+        sxx += dx * dx
+        syy += dy * dy
+        sxy += dx * dy
+
+    if sxx == 0:
+        return np.nan, np.nan, np.nan, np.nan
+
+    slope = sxy / sxx
+    intercept = y_mean - slope * x_mean
+
+    if syy == 0:
+        return np.nan, np.nan, slope, intercept
+
+    r_square = sxy * sxy / (sxx * syy)
+    return r_square, np.sqrt(r_square), slope, intercept
+
+
 class MetricAccumulator:
     """
     Accumulator for any metric.
@@ -12,7 +95,9 @@ class MetricAccumulator:
 
     def __init__(self, name: str):
         self.name = name
-        self.stats = None
+        self._epochs = []
+        self._values = []
+        self._stats = None
 
     def accumulate(self, epoch: int, loss: float):
         """
@@ -27,12 +112,22 @@ class MetricAccumulator:
 
         """
 
-        new_stats = pd.DataFrame({self.name: [loss]})
-        new_stats.index = [epoch]
-        new_stats.index.name = "epoch"
-        self.stats = (
-            new_stats if self.stats is None else pd.concat([self.stats, new_stats])
-        )
+        self._epochs.append(epoch)
+        self._values.append(loss)
+        self._stats = None
+
+    @property
+    def stats(self) -> pd.DataFrame:
+        """
+        The accumulated metric indexed by epoch, or None if nothing was accumulated yet.
+        The dataframe is built once from the buffered values and cached until the next call to accumulate.
+        """
+        if self._stats is None and len(self._values) > 0:
+            self._stats = pd.DataFrame(
+                {self.name: self._values},
+                index=pd.Index(self._epochs, name="epoch"),
+            )
+        return self._stats
 
 
 class TestMetricBase:
@@ -41,10 +136,36 @@ class TestMetricBase:
     and accumulate the metric over time for reporting.
     """
 
+    # classification metrics set this so the MetricManager computes the class labels once for all of them
+    requires_class_labels = False
+
     def __init__(self, columns: List[str]):
         self.columns = columns  # a list of column names for the stats dataframe
-        self.stats = (
-            None  # Stats is a pandas dataframe that stores the test metric over time
+        self._stats_frames = []  # per-epoch stats, concatenated lazily in stats
+        self._stats = None
+
+    @staticmethod
+    def _get_class_labels(test_input: dict):
+        """
+        Get the predicted and target class labels, reusing the ones provided by the MetricManager if present.
+
+        Parameters
+        ----------
+        test_input : dict
+            A dictionary containing the test input data with the keys "predicted" and "target"
+            and optionally the precomputed "predicted_class" and "target_class".
+
+        Returns
+        -------
+        tuple
+            The predicted and target class labels as numpy arrays.
+
+        """
+        if "predicted_class" in test_input and "target_class" in test_input:
+            return test_input["predicted_class"], test_input["target_class"]
+        return (
+            np.argmax(test_input["predicted"], axis=1),
+            np.argmax(test_input["target"], axis=1),
         )
 
     def _update_stats(self, new_stats: pd.DataFrame, epoch: int):
@@ -61,9 +182,18 @@ class TestMetricBase:
         """
         new_stats.index = [epoch]
         new_stats.index.name = "epoch"
-        self.stats = (
-            new_stats if self.stats is None else pd.concat([self.stats, new_stats])
-        )
+        self._stats_frames.append(new_stats)
+        self._stats = None
+
+    @property
+    def stats(self) -> pd.DataFrame:
+        """
+        The test metric over time indexed by epoch, or None if no test was run yet.
+        The per-epoch frames are concatenated once and cached until the next update.
+        """
+        if self._stats is None and len(self._stats_frames) > 0:
+            self._stats = pd.concat(self._stats_frames)
+        return self._stats
 
     def calculate_test_metric(self, test_input: dict, epoch: int):
         """
@@ -114,11 +244,13 @@ class LinearRegressionTestMetric(TestMetricBase):
 
         """
 
-        predictions = test_input["predicted"]
-        targets = test_input["target"]
-        new_stats = linear_regression(predictions, targets)
-        new_stats = pd.DataFrame(new_stats)
-        new_stats.columns = self.columns
+        predictions = np.ravel(test_input["predicted"])
+        targets = np.ravel(test_input["target"])
+        _check_shapes(predictions, targets)
+        new_stats = pd.DataFrame(
+            [_linear_regression(predictions, targets)],
+            columns=self.columns,
+        )
         self._update_stats(new_stats, epoch)
 
         return new_stats
@@ -149,12 +281,13 @@ class AbsErrorPercentileTestMetric(TestMetricBase):
             A pandas dataframe containing the test metric at the given epoch.
 
         """
-        predictions = test_input["predicted"]
-        targets = test_input["target"]
-        abs_error = np.abs(predictions - targets)
-        new_stats = pd.DataFrame(
-            [np.percentile(abs_error, self.percentile)], columns=self.columns
+        predictions = np.ravel(test_input["predicted"])
+        targets = np.ravel(test_input["target"])
+        _check_shapes(predictions, targets)
+        abs_error_percentile = _abs_error_percentile(
+            predictions, targets, self.percentile
         )
+        new_stats = pd.DataFrame([abs_error_percentile], columns=self.columns)
         self._update_stats(new_stats, epoch)
 
         return new_stats
@@ -184,9 +317,10 @@ class L1LossTestMetric(TestMetricBase):
             A pandas dataframe containing the test metric at the given epoch.
 
         """
-        predictions = test_input["predicted"]
-        targets = test_input["target"]
-        l1_loss = np.mean(np.abs(predictions - targets))
+        predictions = np.ravel(test_input["predicted"])
+        targets = np.ravel(test_input["target"])
+        _check_shapes(predictions, targets)
+        l1_loss = _l1_loss(predictions, targets)
         new_stats = pd.DataFrame([l1_loss], columns=self.columns)
         self._update_stats(new_stats, epoch)
 
@@ -233,14 +367,10 @@ class Ms2SimilarityTestMetric(TestMetricBase):
             predict_intensity_df=predicted_fragments,
             fragment_intensity_df=target_fragments,
         )
-        metrics = psm_df[self.metrics]
+        # nanmedian matches the NaN skipping of pd.Series.median
+        medians = np.nanmedian(psm_df[self.metrics].to_numpy(), axis=0)
         new_stats = pd.DataFrame(
-            {
-                "PCC-mean": [metrics["PCC"].median()],
-                "COS-mean": [metrics["COS"].median()],
-                "SA-mean": [metrics["SA"].median()],
-                "SPC-mean": [metrics["SPC"].median()],
-            }
+            medians.reshape(1, -1), columns=[f"{m}-mean" for m in self.metrics]
         )
 
         self._update_stats(new_stats, epoch)
@@ -274,7 +404,8 @@ class CELossTestMetric(TestMetricBase):
         """
         predictions = test_input["predicted"]
         targets = test_input["target"]
-        ce_loss = np.mean(-np.sum(targets * np.log(predictions), axis=1))
+        _check_shapes(predictions, targets)
+        ce_loss = _ce_loss(predictions, targets)
         new_stats = pd.DataFrame([ce_loss], columns=self.columns)
         self._update_stats(new_stats, epoch)
 
@@ -282,6 +413,8 @@ class CELossTestMetric(TestMetricBase):
 
 
 class AccuracyTestMetric(TestMetricBase):
+    requires_class_labels = True
+
     def __init__(self):
         super().__init__(columns=["test_accuracy"])
 
@@ -305,10 +438,7 @@ class AccuracyTestMetric(TestMetricBase):
             A pandas dataframe containing the test metric at the given epoch.
 
         """
-        predictions = test_input["predicted"]
-        targets = test_input["target"]
-        predictions = np.argmax(predictions, axis=1)
-        targets = np.argmax(targets, axis=1)
+        predictions, targets = self._get_class_labels(test_input)
 
         accuracy = np.mean(predictions == targets)
         new_stats = pd.DataFrame([accuracy], columns=self.columns)
@@ -319,6 +449,8 @@ class AccuracyTestMetric(TestMetricBase):
 
 
 class PrecisionRecallTestMetric(TestMetricBase):
+    requires_class_labels = True
+
     def __init__(self):
         super().__init__(columns=["test_precision", "test_recall"])
 
@@ -341,16 +473,17 @@ class PrecisionRecallTestMetric(TestMetricBase):
             A pandas dataframe containing the test metric at the given epoch.
 
         """
-        predictions = test_input["predicted"]
-        targets = test_input["target"]
-        n_classes = predictions.shape[1]
-        predictions = np.argmax(predictions, axis=1)
-        targets = np.argmax(targets, axis=1)
+        n_classes = test_input["predicted"].shape[1]
+        predictions, targets = self._get_class_labels(test_input)
 
-        confusion_matrix = np.zeros((n_classes, n_classes))
-        for i in range(n_classes):
-            for j in range(n_classes):
-                confusion_matrix[i, j] = np.sum((predictions == i) & (targets == j))
+        # rows are predicted classes, columns are target classes
+        confusion_matrix = (
+            np.bincount(
+                predictions * n_classes + targets, minlength=n_classes * n_classes
+            )
+            .reshape(n_classes, n_classes)
+            .astype(np.float64)
+        )
 
         precision = np.diag(confusion_matrix) / np.sum(confusion_matrix, axis=0)
         recall = np.diag(confusion_matrix) / np.sum(confusion_matrix, axis=1)
@@ -410,12 +543,17 @@ class MetricManager:
             A pandas dataframe containing the test metrics at the current epoch.
 
         """
-        result = pd.DataFrame()
-        for test_metric in self.test_metrics:
-            result = pd.concat(
-                [result, test_metric.calculate_test_metric(test_inp, self.epoch)],
-                axis=1,
-            )
+        if any(test_metric.requires_class_labels for test_metric in self.test_metrics):
+            test_inp = {
+                **test_inp,
+                "predicted_class": np.argmax(test_inp["predicted"], axis=1),
+                "target_class": np.argmax(test_inp["target"], axis=1),
+            }
+        results = [
+            test_metric.calculate_test_metric(test_inp, self.epoch)
+            for test_metric in self.test_metrics
+        ]
+        result = pd.concat(results, axis=1) if results else pd.DataFrame()
         self.epoch += self.test_interval
         return result
 
@@ -459,16 +597,12 @@ class MetricManager:
 
         """
 
-        result = (
-            self.training_loss_accumulators.stats
-            if self.training_loss_accumulators.stats is not None
-            else pd.DataFrame()
-        )
-        if self.lr_accumulator.stats is not None:
-            result = pd.concat([result, self.lr_accumulator.stats], axis=1)
-        for test_metric in self.test_metrics:
-            stats = test_metric.stats
-            result = pd.concat([result, stats], axis=1)
+        stats = [
+            self.training_loss_accumulators.stats,
+            self.lr_accumulator.stats,
+        ] + [test_metric.stats for test_metric in self.test_metrics]
+        stats = [s for s in stats if s is not None]
+        result = pd.concat(stats, axis=1) if stats else pd.DataFrame()
         result.reset_index(inplace=True)
 
         return result
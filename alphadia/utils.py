@@ -4,21 +4,18 @@ from ctypes import Structure, c_double
 import typing
 import re
 import platform
-import torch
 
 logger = logging.getLogger()
 
 # alphadia imports
 
 # alpha family imports
-import alphatims.bruker
 import alphatims.utils
 
 # third party imports
 import pandas as pd
 import numpy as np
 import numba as nb
-import matplotlib.patches as patches
 
 
 ISOTOPE_DIFF = 1.0032999999999674
@@ -39,6 +36,7 @@ def get_torch_device(use_gpu: bool = False):
         Device to be used, either 'cpu', 'gpu' or 'mps'
 
     """
+    import torch
 
     device = "cpu"
     if use_gpu:
@@ -52,12 +50,14 @@ def get_torch_device(use_gpu: bool = False):
     return device
 
 
-@nb.njit
 def candidate_hash(precursor_idx, rank):
     # create a 64 bit hash from the precursor_idx, number and type
     # the precursor_idx is the lower 32 bits
     # the rank is the next 8 bits
-    return precursor_idx + (rank << 32)
+    # plain numpy on int64 avoids compiling a numba specialization for every input dtype pair
+    return precursor_idx.astype(np.int64, copy=False) + (
+        rank.astype(np.int64, copy=False) << 32
+    )
 
 
 @nb.njit
@@ -189,6 +189,9 @@ def normal(x, mu, sigma):
 
 
 def plt_limits(mobility_limits, dia_cycle_limits):
+    # matplotlib is only needed here and is imported lazily so that importing utils does not load it
+    import matplotlib.patches as patches
+
     mobility_len = mobility_limits[1] - mobility_limits[0]
     dia_cycle_len = dia_cycle_limits[1] - dia_cycle_limits[0]
 
@@ -208,9 +211,12 @@ def plt_limits(mobility_limits, dia_cycle_limits):
 def find_peaks_1d(a, top_n=3):
     """accepts a dense representation and returns the top three peaks"""
 
-    scan = []
-    dia_cycle = []
-    intensity = []
+    # every interior position can be a peak at most once
+    max_peaks = max(a.shape[1] - 4, 0)
+    scan = np.zeros(max_peaks, dtype=np.int64)
+    dia_cycle = np.empty(max_peaks, dtype=np.int64)
+    intensity = np.empty(max_peaks, dtype=a.dtype)
+    n_peaks = 0
 
     for p in range(2, a.shape[1] - 2):
         isotope_is_peak = (
@@ -218,13 +224,13 @@ def find_peaks_1d(a, top_n=3):
         )
 
         if isotope_is_peak:
-            intensity.append(a[0, p])
-            scan.append(0)
-            dia_cycle.append(p)
+            intensity[n_peaks] = a[0, p]
+            dia_cycle[n_peaks] = p
+            n_peaks += 1
 
-    scan = np.array(scan)
-    dia_cycle = np.array(dia_cycle)
-    intensity = np.array(intensity)
+    scan = scan[:n_peaks]
+    dia_cycle = dia_cycle[:n_peaks]
+    intensity = intensity[:n_peaks]
 
     idx = np.argsort(intensity)[::-1][:top_n]
 
@@ -238,9 +244,13 @@ def find_peaks_1d(a, top_n=3):
 @alphatims.utils.njit()
 def find_peaks_2d(a, top_n=3):
     """accepts a dense representation and returns the top three peaks"""
-    scan = []
-    dia_cycle = []
-    intensity = []
+
+    # every interior position can be a peak at most once
+    max_peaks = max(a.shape[0] - 4, 0) * max(a.shape[1] - 4, 0)
+    scan = np.empty(max_peaks, dtype=np.int64)
+    dia_cycle = np.empty(max_peaks, dtype=np.int64)
+    intensity = np.empty(max_peaks, dtype=a.dtype)
+    n_peaks = 0
 
     for s in range(2, a.shape[0] - 2):
         for p in range(2, a.shape[1] - 2):
@@ -252,13 +262,14 @@ def find_peaks_2d(a, top_n=3):
             )
 
             if isotope_is_peak:
-                intensity.append(a[s, p])
-                scan.append(s)
-                dia_cycle.append(p)
+                intensity[n_peaks] = a[s, p]
+                scan[n_peaks] = s
+                dia_cycle[n_peaks] = p
+                n_peaks += 1
 
-    scan = np.array(scan)
-    dia_cycle = np.array(dia_cycle)
-    intensity = np.array(intensity)
+    scan = scan[:n_peaks]
+    dia_cycle = dia_cycle[:n_peaks]
+    intensity = intensity[:n_peaks]
 
     idx = np.argsort(intensity)[::-1][:top_n]
 
@@ -324,11 +335,13 @@ def get_isotope_column_names(colnames):
     return [f"i_{i}" for i in get_isotope_columns(colnames)]
 
 
-@alphatims.utils.njit()
+@alphatims.utils.njit(inline="always")
 def mass_range(mz_list, ppm_tolerance):
-    out_mz = np.zeros((len(mz_list), 2), dtype=mz_list.dtype)
-    out_mz[:, 0] = mz_list - ppm_tolerance * mz_list / (10**6)
-    out_mz[:, 1] = mz_list + ppm_tolerance * mz_list / (10**6)
+    out_mz = np.empty((len(mz_list), 2), dtype=mz_list.dtype)
+    for i in range(len(mz_list)):
+        delta = ppm_tolerance * mz_list[i] / (10**6)
+        out_mz[i, 0] = mz_list[i] - delta
+        out_mz[i, 1] = mz_list[i] + delta
     return out_mz
 
 
@@ -354,7 +367,7 @@ def tile(a, n):
     return np.repeat(a, n).reshape(-1, n).T.flatten()
 
 
-@alphatims.utils.njit
+@alphatims.utils.njit(inline="always")
 def make_slice_1d(start_stop):
     """Numba helper function to create a 1D slice object from a start and stop value.
 
@@ -374,7 +387,7 @@ def make_slice_1d(start_stop):
     return np.array([[start_stop[0], start_stop[1], 1]], dtype=start_stop.dtype)
 
 
-@alphatims.utils.njit
+@alphatims.utils.njit(inline="always")
 def make_slice_2d(start_stop):
     """Numba helper function to create a 2D slice object from multiple start and stop value.
 
@@ -458,6 +471,43 @@ def fourier_filter(dense_stack, kernel):
     return smooth_output
 
 
+@nb.njit
+def _channel_score_groups(elution_group_idx, decoy, rank):
+    """
+    Calculate score groups for channel grouping.
+
+    Parameters
+    ----------
+
+    elution_group_idx : numpy.ndarray
+        Elution group indices.
+
+    decoy : numpy.ndarray
+        Decoy status.
+
+    rank : numpy.ndarray
+        Rank of precursor.
+
+    Returns
+    -------
+
+    score_groups : numpy.ndarray
+        Score groups.
+    """
+    score_groups = np.zeros(len(elution_group_idx), dtype=np.uint32)
+
+    for i in range(1, len(elution_group_idx)):
+        # if elution group, decoy status or rank changes, increase score group
+        changed = (
+            (elution_group_idx[i] != elution_group_idx[i - 1])
+            | (decoy[i] != decoy[i - 1])
+            | (rank[i] != rank[i - 1])
+        )
+        score_groups[i] = score_groups[i - 1] + np.uint32(changed)
+
+    return score_groups
+
+
 def calculate_score_groups(
     input_df: pd.DataFrame,
     group_channels: bool = False,
@@ -533,50 +583,6 @@ def calculate_score_groups(
 
     """
 
-    @nb.njit
-    def channel_score_groups(elution_group_idx, decoy, rank):
-        """
-        Calculate score groups for channel grouping.
-
-        Parameters
-        ----------
-
-        elution_group_idx : numpy.ndarray
-            Elution group indices.
-
-        decoy : numpy.ndarray
-            Decoy status.
-
-        rank : numpy.ndarray
-            Rank of precursor.
-
-        Returns
-        -------
-
-        score_groups : numpy.ndarray
-            Score groups.
-        """
-        score_groups = np.zeros(len(elution_group_idx), dtype=np.uint32)
-        current_group = 0
-        current_eg = elution_group_idx[0]
-        current_decoy = decoy[0]
-        current_rank = rank[0]
-
-        for i in range(len(elution_group_idx)):
-            # if elution group, decoy status or rank changes, increase score group
-            if (
-                (elution_group_idx[i] != current_eg)
-                or (decoy[i] != current_decoy)
-                or (rank[i] != current_rank)
-            ):
-                current_group += 1
-                current_eg = elution_group_idx[i]
-                current_decoy = decoy[i]
-                current_rank = rank[i]
-
-            score_groups[i] = current_group
-        return score_groups
-
     # sort by elution group, decoy and rank
     # if no rank is present, pretend rank 0
     if "rank" in input_df.columns:
@@ -587,13 +593,15 @@ def calculate_score_groups(
         rank_values = np.zeros(len(input_df), dtype=np.uint32)
 
     if group_channels:
-        input_df["score_group_idx"] = channel_score_groups(
+        input_df["score_group_idx"] = _channel_score_groups(
             input_df["elution_group_idx"].values, input_df["decoy"].values, rank_values
         )
     else:
         input_df["score_group_idx"] = np.arange(len(input_df), dtype=np.uint32)
 
-    return input_df.sort_values(by=["score_group_idx"]).reset_index(drop=True)
+    # score groups are assigned in ascending order along the sorted dataframe,
+    # so the dataframe is already sorted by score_group_idx
+    return input_df.reset_index(drop=True)
 
 
 @nb.njit()
@@ -32,6 +32,28 @@ class Property:
         self.name = name
         self.type = type
 
+    def _dtype(self, df, dtypes=None):
+        """
+        Returns the dtype of the property column or None if it is not present
+
+        Parameters
+        ----------
+
+        df: pd.DataFrame
+            Dataframe to validate
+
+        dtypes: dict, optional
+            Precomputed mapping of column names to dtypes, e.g. from `df.dtypes.to_dict()`
+        """
+
+        if dtypes is not None:
+            return dtypes.get(self.name)
+
+        if self.name in df.columns:
+            return df[self.name].dtype
+
+        return None
+
 
 class Optional(Property):
     """Optional property"""
@@ -54,7 +76,7 @@ class Optional(Property):
         self.name = name
         self.type = type
 
-    def __call__(self, df, logging=True):
+    def __call__(self, df, logging=True, dtypes=None):
         """
         Casts the property to the specified type if it is present in the dataframe
 
@@ -66,11 +88,14 @@ class Optional(Property):
 
         logging: bool
             If True, log the validation results
+
+        dtypes: dict, optional
+            Precomputed mapping of column names to dtypes, e.g. from `df.dtypes.to_dict()`
         """
 
-        if self.name in df.columns:
-            if df[self.name].dtype != self.type:
-                df[self.name] = df[self.name].astype(self.type)
+        dtype = self._dtype(df, dtypes)
+        if dtype is not None and dtype != self.type:
+            df[self.name] = df[self.name].astype(self.type)
 
         return True
 
@@ -95,7 +120,7 @@ class Required(Property):
         self.name = name
         self.type = type
 
-    def __call__(self, df, logging=True):
+    def __call__(self, df, logging=True, dtypes=None):
         """
         Casts the property to the specified type if it is present in the dataframe
 
@@ -108,16 +133,20 @@ class Required(Property):
         logging: bool
             If True, log the validation results
 
-        """
+        dtypes: dict, optional
+            Precomputed mapping of column names to dtypes, e.g. from `df.dtypes.to_dict()`
 
-        if self.name in df.columns:
-            if df[self.name].dtype != self.type:
-                df[self.name] = df[self.name].astype(self.type)
+        """
 
-            return True
-        else:
+        dtype = self._dtype(df, dtypes)
+        if dtype is None:
             return False
 
+        if dtype != self.type:
+            df[self.name] = df[self.name].astype(self.type)
+
+        return True
+
 
 class Schema:
     def __init__(self, name, properties):
@@ -156,8 +185,11 @@ class Schema:
 
         """
 
+        # look up all column dtypes at once instead of selecting every column
+        dtypes = df.dtypes.to_dict()
+
         for property in self.schema:
-            if not property(df, logging=logging):
+            if not property(df, logging=logging, dtypes=dtypes):
                 raise ValueError(
                     f"Validation of {self.name} failed: Column {property.name} is not present in the dataframe"
                 )
@@ -332,10 +364,16 @@ candidates_df.__doc__ += candidates_schema.docstring()
 
 
 def check_critical_values(input_df):
-    for col in input_df.columns:
-        if np.issubdtype(input_df[col].dtype, np.floating):
-            nan_count = input_df[col].isna().sum()
-            inf_count = np.isinf(input_df[col]).sum()
+    for col, dtype in input_df.dtypes.items():
+        if np.issubdtype(dtype, np.floating):
+            values = input_df[col].values
+
+            # a single pass is enough for the common case without NaNs or Infs
+            if np.isfinite(values).all():
+                continue
+
+            nan_count = np.isnan(values).sum()
+            inf_count = np.isinf(values).sum()
 
             if nan_count > 0:
                 nan_percentage = nan_count / len(input_df) * 100
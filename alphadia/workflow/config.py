@@ -25,13 +25,18 @@ In our analysis, we focus on discerning changes between the default configuratio
 import yaml
 from typing import List, Dict, Any, Union
 import copy
+import functools
 import json
+import os
 import pandas as pd
 import numpy as np
 import logging
 
 logger = logging.getLogger()
 
+# use the libyaml based loader if PyYAML was built with it
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def get_tree_structure(last_item_arr: List[bool], update=False):
     tree_structure = ""
@@ -478,6 +483,33 @@ def get_update_table(
     return df
 
 
+@functools.lru_cache(maxsize=32)
+def _parse_yaml(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a yaml file. The modification time and size are part of the cache key so that edited files are parsed again."""
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+
+def load_yaml(path: str) -> Dict[str, Any]:
+    """
+    Load a yaml file, reusing the parsed content if the file has not changed since it was last loaded.
+
+    Parameters
+    ----------
+    path : str
+        Path to the yaml file
+
+    Returns
+    -------
+    Dict[str, Any]
+        Parsed yaml content. A deep copy is returned as configs are updated in place.
+    """
+    stat = os.stat(path)
+    return copy.deepcopy(
+        _parse_yaml(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    )
+
+
 class Config:
     """
     Config class that can read from and write to yaml and json files
@@ -491,8 +523,7 @@ class Config:
         self.translated_config = {}
 
     def from_yaml(self, path: str) -> None:
-        with open(path, "r") as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_yaml(path)
 
     def from_json(self, path: str) -> None:
         with open(path, "r") as f:
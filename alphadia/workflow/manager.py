@@ -563,9 +563,10 @@ class FDRManager(BaseManager):
             channels = features_df["channel"].unique()
             psm_df_list = []
             for channel in channels:
+                # the mask already returns a new frame and the splits below are copied
                 channel_df = features_df[
                     features_df["channel"].isin([channel, decoy_channel])
-                ].copy()
+                ]
                 psm_df_list.append(
                     fdr.perform_fdr(
                         classifier,
@@ -586,7 +587,7 @@ class FDRManager(BaseManager):
             for channel in channels:
                 channel_df = features_df[
                     features_df["channel"].isin([channel, decoy_channel])
-                ].copy()
+                ]
                 psm_df_list.append(
                     fdr.perform_fdr(
                         classifier,
@@ -18,7 +18,6 @@ from alphabase.peptide.fragment import get_charged_frag_types
 # third party imports
 import numpy as np
 import pandas as pd
-import seaborn as sns
 
 feature_columns = [
     "reference_intensity_correlation",
@@ -187,22 +186,27 @@ class PeptideCentricWorkflow(base.WorkflowBase):
                 verbosity="progress",
             )
 
+        # bind the backing precursor frame once, it is replaced by the filtered frames below
+        precursor_df = self.spectral_library._precursor_df
+
         # normalize spectral library rt to file specific TIC profile
-        self.spectral_library._precursor_df["rt_library"] = self.norm_to_rt(
-            self.dia_data, self.spectral_library._precursor_df["rt_library"].values
+        precursor_df["rt_library"] = self.norm_to_rt(
+            self.dia_data, precursor_df["rt_library"].values
         )
 
         # filter based on precursor observability
-        lower_mz_limit = self.dia_data.cycle[self.dia_data.cycle > 0].min()
-        upper_mz_limit = self.dia_data.cycle[self.dia_data.cycle > 0].max()
+        quadrupole_limits = self.dia_data.cycle[self.dia_data.cycle > 0]
+        lower_mz_limit = quadrupole_limits.min()
+        upper_mz_limit = quadrupole_limits.max()
 
-        precursor_before = np.sum(self.spectral_library._precursor_df["decoy"] == 0)
-        self.spectral_library._precursor_df = self.spectral_library._precursor_df[
-            (self.spectral_library._precursor_df["mz_library"] >= lower_mz_limit)
-            & (self.spectral_library._precursor_df["mz_library"] <= upper_mz_limit)
-        ]
-        # self.spectral_library.remove_unused_fragmen
-        precursor_after = np.sum(self.spectral_library._precursor_df["decoy"] == 0)
+        mz_library = precursor_df["mz_library"].values
+        observable_mask = (mz_library >= lower_mz_limit) & (
+            mz_library <= upper_mz_limit
+        )
+        target_mask = precursor_df["decoy"].values == 0
+
+        precursor_before = np.sum(target_mask)
+        precursor_after = np.sum(target_mask & observable_mask)
         precursor_removed = precursor_before - precursor_after
         self.reporter.log_string(
             f"{precursor_after:,} target precursors potentially observable ({precursor_removed:,} removed)",
@@ -211,16 +215,11 @@ class PeptideCentricWorkflow(base.WorkflowBase):
 
         # filter spectral library to only contain precursors from allowed channels
         # save original precursor_df for later use
-        self.spectral_library.precursor_df_unfiltered = (
-            self.spectral_library.precursor_df.copy()
-        )
-        self.spectral_library._precursor_df = (
-            self.spectral_library.precursor_df_unfiltered[
-                self.spectral_library.precursor_df_unfiltered["channel"].isin(
-                    allowed_channels
-                )
-            ].copy()
-        )
+        precursor_df = precursor_df[observable_mask]
+        self.spectral_library.precursor_df_unfiltered = precursor_df.copy()
+        self.spectral_library._precursor_df = precursor_df[
+            precursor_df["channel"].isin(allowed_channels)
+        ].copy()
 
     def norm_to_rt(
         self,
@@ -278,11 +277,6 @@ class PeptideCentricWorkflow(base.WorkflowBase):
         else:
             upper_rt = active_gradient_stop
 
-        # make sure values are really norm values
-        norm_values = np.interp(
-            norm_values, [norm_values.min(), norm_values.max()], [0, 1]
-        )
-
         # determine the mode based on the config or the function parameter
         if mode is None:
             mode = (
@@ -294,7 +288,14 @@ class PeptideCentricWorkflow(base.WorkflowBase):
             mode = mode.lower()
 
         if mode == "linear":
-            return np.interp(norm_values, [0, 1], [lower_rt, upper_rt])
+            # make sure values are really norm values
+            # rescaling to [0, 1] and mapping onto the gradient are both linear,
+            # so they are applied as a single interpolation
+            return np.interp(
+                norm_values,
+                [norm_values.min(), norm_values.max()],
+                [lower_rt, upper_rt],
+            )
 
         elif mode == "tic":
             raise NotImplementedError("tic mode is not implemented yet")
@@ -306,26 +307,46 @@ class PeptideCentricWorkflow(base.WorkflowBase):
         """Get the number of batches for a given step
         This plan has the shape:
         1, 2, 4, 8, 16, 32, 64, ...
+
+        step can be a single step or an integer array of steps.
         """
-        return int(2**step)
+        return np.left_shift(1, step)
 
     def get_batch_plan(self):
         n_eg = self.spectral_library._precursor_df["elution_group_idx"].nunique()
 
-        plan = []
-
         batch_size = self.config["calibration"]["batch_size"]
-        step = 0
-        start_index = 0
 
-        while start_index < n_eg:
-            n_batches = self.get_exponential_batches(step)
-            stop_index = min(start_index + n_batches * batch_size, n_eg)
-            plan.append((start_index, stop_index))
-            step += 1
-            start_index = stop_index
+        # step k covers 2**k batches, so the first n steps cover
+        # batch_size * (2**n - 1) elution groups
+        n_steps = int(np.ceil(np.log2(n_eg / batch_size + 1))) + 1
+        steps = np.arange(n_steps, dtype=np.int64)
+        stops = np.minimum(
+            np.cumsum(batch_size * self.get_exponential_batches(steps)), n_eg
+        )
+        starts = np.concatenate([[0], stops[:-1]])
+
+        valid = starts < n_eg
+        return list(zip(starts[valid].tolist(), stops[valid].tolist()))
 
-        return plan
+    def get_elution_group_position(self, elution_group_order):
+        """Get the position of each precursor's elution group in the given elution group order.
+        Batches of the batch plan are then contiguous ranges of positions.
+        """
+        elution_group_idx = self.spectral_library._precursor_df[
+            "elution_group_idx"
+        ].values
+        order_sorter = np.argsort(elution_group_order)
+        return order_sorter[
+            np.searchsorted(elution_group_order, elution_group_idx, sorter=order_sorter)
+        ]
+
+    def get_batch_df(self, start_index, stop_index):
+        """Get all precursors whose elution group is at a position between start_index and stop_index."""
+        return self.spectral_library._precursor_df[
+            (self.elution_group_position >= start_index)
+            & (self.elution_group_position < stop_index)
+        ]
 
     def start_of_calibration(self):
         self.batch_plan = self.get_batch_plan()
@@ -340,6 +361,9 @@ class PeptideCentricWorkflow(base.WorkflowBase):
             "elution_group_idx"
         ].unique()
         np.random.shuffle(self.elution_group_order)
+        self.elution_group_position = self.get_elution_group_position(
+            self.elution_group_order
+        )
 
         self.calibration_manager.predict(
             self.spectral_library._precursor_df, "precursor"
@@ -466,12 +490,7 @@ class PeptideCentricWorkflow(base.WorkflowBase):
             for current_step, (start_index, stop_index) in enumerate(self.batch_plan):
                 self.start_of_step(current_step, start_index, stop_index)
 
-                eg_idxes = self.elution_group_order[start_index:stop_index]
-                batch_df = self.spectral_library._precursor_df[
-                    self.spectral_library._precursor_df["elution_group_idx"].isin(
-                        eg_idxes
-                    )
-                ]
+                batch_df = self.get_batch_df(start_index, stop_index)
 
                 feature_df, fragment_df = self.extract_batch(batch_df)
                 features += [feature_df]
@@ -702,8 +721,6 @@ class PeptideCentricWorkflow(base.WorkflowBase):
         )
         candidates_df = extraction(thread_count=self.config["general"]["thread_count"])
 
-        sns.histplot(candidates_df, x="score", hue="decoy", bins=100)
-
         if apply_cutoff:
             num_before = len(candidates_df)
             self.reporter.log_string(
@@ -827,28 +844,23 @@ class PeptideCentricWorkflow(base.WorkflowBase):
         self.reporter.log_string("", verbosity="progress")
         self.reporter.log_string("Precursor Summary:", verbosity="progress")
 
-        for channel in precursor_df["channel"].unique():
-            precursor_05fdr = len(
-                precursor_df[
-                    (precursor_df["qval"] < 0.05)
-                    & (precursor_df["decoy"] == 0)
-                    & (precursor_df["channel"] == channel)
-                ]
-            )
-            precursor_01fdr = len(
-                precursor_df[
-                    (precursor_df["qval"] < 0.01)
-                    & (precursor_df["decoy"] == 0)
-                    & (precursor_df["channel"] == channel)
-                ]
-            )
-            precursor_001fdr = len(
-                precursor_df[
-                    (precursor_df["qval"] < 0.001)
-                    & (precursor_df["decoy"] == 0)
-                    & (precursor_df["channel"] == channel)
-                ]
-            )
+        # sort targets by qval once so that the number of entries below each
+        # threshold can be read off with a binary search per channel
+        fdr_thresholds = np.array([0.05, 0.01, 0.001])
+        target_df = precursor_df[precursor_df["decoy"] == 0].sort_values(
+            "qval", kind="stable"
+        )
+        channel_df = {
+            channel: target_df[target_df["channel"] == channel]
+            for channel in precursor_df["channel"].unique()
+        }
+        channel_counts = {
+            channel: np.searchsorted(df["qval"].values, fdr_thresholds, side="left")
+            for channel, df in channel_df.items()
+        }
+
+        for channel, counts in channel_counts.items():
+            precursor_05fdr, precursor_01fdr, precursor_001fdr = counts
             self.reporter.log_string(
                 f"Channel {channel:>3}:\t 0.05 FDR: {precursor_05fdr:>5,}; 0.01 FDR: {precursor_01fdr:>5,}; 0.001 FDR: {precursor_001fdr:>5,}",
                 verbosity="progress",
@@ -857,22 +869,11 @@ class PeptideCentricWorkflow(base.WorkflowBase):
         self.reporter.log_string("", verbosity="progress")
         self.reporter.log_string("Protein Summary:", verbosity="progress")
 
-        for channel in precursor_df["channel"].unique():
-            proteins_05fdr = precursor_df[
-                (precursor_df["qval"] < 0.05)
-                & (precursor_df["decoy"] == 0)
-                & (precursor_df["channel"] == channel)
-            ]["proteins"].nunique()
-            proteins_01fdr = precursor_df[
-                (precursor_df["qval"] < 0.01)
-                & (precursor_df["decoy"] == 0)
-                & (precursor_df["channel"] == channel)
-            ]["proteins"].nunique()
-            proteins_001fdr = precursor_df[
-                (precursor_df["qval"] < 0.001)
-                & (precursor_df["decoy"] == 0)
-                & (precursor_df["channel"] == channel)
-            ]["proteins"].nunique()
+        for channel, counts in channel_counts.items():
+            proteins = channel_df[channel]["proteins"]
+            proteins_05fdr, proteins_01fdr, proteins_001fdr = (
+                proteins.iloc[:count].nunique() for count in counts
+            )
             self.reporter.log_string(
                 f"Channel {channel:>3}:\t 0.05 FDR: {proteins_05fdr:>5,}; 0.01 FDR: {proteins_01fdr:>5,}; 0.001 FDR: {proteins_001fdr:>5,}",
                 verbosity="progress",
@@ -883,12 +884,8 @@ class PeptideCentricWorkflow(base.WorkflowBase):
             verbosity="progress",
         )
 
-        precursor_01fdr = len(
-            precursor_df[(precursor_df["qval"] < 0.01) & (precursor_df["decoy"] == 0)]
-        )
-        proteins_01fdr = precursor_df[
-            (precursor_df["qval"] < 0.01) & (precursor_df["decoy"] == 0)
-        ]["proteins"].nunique()
+        precursor_01fdr = np.searchsorted(target_df["qval"].values, 0.01, side="left")
+        proteins_01fdr = target_df["proteins"].iloc[:precursor_01fdr].nunique()
 
         # if self.neptune is not None:
         #    self.neptune['precursors'].log(precursor_01fdr)
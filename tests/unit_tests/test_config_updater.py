@@ -157,3 +157,23 @@ def test_get_modifications_table():
     target = pd.read_csv(StringIO(target_tsv), sep="\t", index_col=0)
 
     pd.testing.assert_frame_equal(table, target)
+
+
+def test_from_yaml_cached(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(default_config)
+
+    config_1 = Config("Experiment 1")
+    config_1.from_yaml(str(path))
+    config_1.config["library_prediction"]["missed_cleavages"] = 100
+
+    # the cached content must not be affected by in place updates
+    config_2 = Config("Experiment 2")
+    config_2.from_yaml(str(path))
+    assert config_2.config == yaml.safe_load(StringIO(default_config))
+
+    # a modified file is parsed again
+    path.write_text(config_1_yaml + "\n")
+    config_3 = Config("Experiment 3")
+    config_3.from_yaml(str(path))
+    assert config_3.config == yaml.safe_load(StringIO(config_1_yaml))
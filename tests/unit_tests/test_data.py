@@ -22,6 +22,36 @@ def test_transpose():
     assert np.allclose(intensity_values, _intensity_values)
 
 
+def test_transpose_preallocated():
+    values = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+    tof_indices = np.array([0, 3, 2, 4, 1, 2, 4])
+    push_ptr = np.array([0, 2, 4, 5, 7])
+
+    tof_indptr = bruker.transpose_indptr(tof_indices)
+    push_indices = np.empty(len(tof_indices), dtype=np.uint32)
+    intensity_values = np.empty_like(values)
+    bruker.transpose_values(
+        tof_indices, push_ptr, values, tof_indptr, push_indices, intensity_values
+    )
+
+    _push_indices, _tof_indptr, _intensity_values = bruker.transpose(
+        tof_indices, push_ptr, values
+    )
+
+    assert np.array_equal(push_indices, _push_indices)
+    assert np.array_equal(tof_indptr, _tof_indptr)
+    assert np.array_equal(intensity_values, _intensity_values)
+
+
+def test_gallop_left():
+    array = np.sort(np.random.randint(0, 50, 100)).astype(np.uint32)
+
+    for left in [0, 1, 10, 50, 99, 100]:
+        for value in range(-1, 52):
+            expected = left + np.searchsorted(array[left:], value, side="left")
+            assert bruker.gallop_left(array, left, value) == expected
+
+
 def test_cycle():
     rand_cycle_start = np.random.randint(0, 100)
     rand_cycle_length = np.random.randint(5, 10)
@@ -133,6 +133,11 @@ def test_keep_best():
     )
     pd.testing.assert_frame_equal(result_df, result_expected)
 
+    # the result is a new frame, assigning a column must not warn about a copy
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", pd.errors.SettingWithCopyWarning)
+        result_df["qval"] = 0.0
+
 
 def test_fdr_to_q_values():
     test_fdr = np.array([0.2, 0.1, 0.05, 0.3, 0.26, 0.25, 0.5])
@@ -3,6 +3,7 @@ Test the metrics module.
 """
 
 import numpy as np
+import pytest
 from alphadia.transferlearning.metrics import (
     MetricAccumulator,
     LinearRegressionTestMetric,
@@ -291,3 +292,125 @@ def test_trainLossAccumulation():
     assert "train_loss" in df.columns.tolist()
 
     assert np.all(df.loc[:, "train_loss"].values == train_loss)
+
+
+def test_MetricManager_classification():
+    """
+    Test that the class labels shared by the MetricManager give the same results as the standalone metrics
+    """
+    # Given
+    test_inp = get_classification_test_input()
+    metric_manager = MetricManager(
+        model_name="test_model",
+        test_interval=1,
+        test_metrics=[
+            CELossTestMetric(),
+            AccuracyTestMetric(),
+            PrecisionRecallTestMetric(),
+        ],
+    )
+
+    # When
+    results = metric_manager.calculate_test_metric(test_inp)
+
+    # Then
+    assert "predicted_class" not in test_inp
+    assert isclose(
+        results.loc[0, "test_accuracy"],
+        AccuracyTestMetric()
+        .calculate_test_metric(epoch=0, test_input=test_inp)
+        .loc[0, "test_accuracy"],
+    )
+    expected = PrecisionRecallTestMetric().calculate_test_metric(
+        epoch=0, test_input=test_inp
+    )
+    assert isclose(results.loc[0, "test_precision"], expected.loc[0, "test_precision"])
+    assert isclose(results.loc[0, "test_recall"], expected.loc[0, "test_recall"])
+
+
+def test_regression_metrics_empty_input():
+    """
+    Test that the regression metrics return NaN for an empty test set
+    """
+    # Given
+    test_inp = {"predicted": np.array([]), "target": np.array([])}
+
+    # When
+    l1_results = L1LossTestMetric().calculate_test_metric(epoch=0, test_input=test_inp)
+    percentile_results = AbsErrorPercentileTestMetric(
+        percentile=95
+    ).calculate_test_metric(epoch=0, test_input=test_inp)
+
+    # Then
+    assert np.isnan(l1_results.loc[0, "test_loss"])
+    assert np.isnan(percentile_results.loc[0, "abs_error_95th_percentile"])
+
+
+def test_CELossTestMetric_edge_cases():
+    """
+    Test that the CELossTestMetric is NaN for an empty test set and infinite for a zero probability on the target class
+    """
+    # Given
+    empty_inp = {"predicted": np.zeros((0, 2)), "target": np.zeros((0, 2))}
+    zero_probability_inp = {
+        "predicted": np.array([[1.0, 0.0], [0.5, 0.5]]),
+        "target": np.array([[0.0, 1.0], [1.0, 0.0]]),
+    }
+
+    # When
+    metric = CELossTestMetric()
+    empty_results = metric.calculate_test_metric(epoch=0, test_input=empty_inp)
+    zero_probability_results = metric.calculate_test_metric(
+        epoch=1, test_input=zero_probability_inp
+    )
+
+    # Then
+    assert np.isnan(empty_results.loc[0, "test_loss"])
+    assert np.isposinf(zero_probability_results.loc[1, "test_loss"])
+
+
+def test_metrics_mismatched_shapes():
+    """
+    Test that the metrics raise a ValueError if predictions and targets differ in shape
+    """
+    # Given
+    regression_inp = {"predicted": np.ones(4), "target": np.ones(3)}
+    classification_inp = {"predicted": np.full((4, 2), 0.5), "target": np.ones((3, 2))}
+
+    # When / Then
+    with pytest.raises(ValueError):
+        L1LossTestMetric().calculate_test_metric(epoch=0, test_input=regression_inp)
+    with pytest.raises(ValueError):
+        AbsErrorPercentileTestMetric(percentile=95).calculate_test_metric(
+            epoch=0, test_input=regression_inp
+        )
+    with pytest.raises(ValueError):
+        LinearRegressionTestMetric().calculate_test_metric(
+            epoch=0, test_input=regression_inp
+        )
+    with pytest.raises(ValueError):
+        CELossTestMetric().calculate_test_metric(epoch=0, test_input=classification_inp)
+
+
+def test_LinearRegressionTestMetric_constant_input():
+    """
+    Test that the LinearRegressionTestMetric reports undefined statistics as NaN instead of failing for constant input
+    """
+    # Given
+    metric = LinearRegressionTestMetric()
+
+    # When
+    constant_predictions = metric.calculate_test_metric(
+        epoch=0, test_input={"predicted": np.ones(10), "target": np.arange(10.0)}
+    )
+    constant_targets = metric.calculate_test_metric(
+        epoch=1, test_input={"predicted": np.arange(10.0), "target": np.ones(10)}
+    )
+
+    # Then
+    assert constant_predictions.loc[0].isna().all()
+
+    assert np.isnan(constant_targets.loc[1, "test_r_square"])
+    assert np.isnan(constant_targets.loc[1, "test_r"])
+    assert isclose(constant_targets.loc[1, "test_slope"], 0.0)
+    assert isclose(constant_targets.loc[1, "test_intercept"], 1.0)
@@ -1,8 +1,13 @@
 import numpy as np
+import numba as nb
 
 # local
 from alphadia import utils
-from alphadia.numba.fragments import get_ion_group_mapping
+from alphadia.numba.fragments import (
+    get_ion_group_mapping,
+    FragmentContainer,
+    slice_manual,
+)
 
 from alphadia.numba.fft import convolve_fourier
 
@@ -195,3 +200,53 @@ def test_fragment_correlation_different():
     corr = fragment_correlation_different(b, b)
     assert corr.shape == (10, 10, 10)
     assert np.allclose(corr, b)
+
+
+def test_fragment_container_sort_by_mz():
+    for mz in [
+        np.array([300.0, 100.0, 200.0, 400.0], dtype=np.float32),
+        np.array([100.0, 200.0, 300.0, 400.0], dtype=np.float32),
+    ]:
+        container = FragmentContainer(
+            mz,
+            mz,
+            mz / 100,
+            np.arange(4, dtype=np.uint8),
+            np.zeros(4, dtype=np.uint8),
+            np.ones(4, dtype=np.uint8),
+            np.arange(4, dtype=np.uint8),
+            np.arange(4, dtype=np.uint8),
+            np.ones(4, dtype=np.uint8),
+        )
+        order = np.argsort(mz)
+        container.sort_by_mz()
+
+        assert np.all(np.diff(container.mz) >= 0)
+        assert np.allclose(container.intensity, mz[order] / 100)
+        assert np.all(container.type == order)
+
+
+def test_fragment_container_slice():
+    mz = np.arange(100, 110, dtype=np.float32)
+    container = FragmentContainer(
+        mz,
+        mz,
+        mz / 100,
+        np.arange(10, dtype=np.uint8),
+        np.zeros(10, dtype=np.uint8),
+        np.ones(10, dtype=np.uint8),
+        np.arange(10, dtype=np.uint8),
+        np.arange(10, dtype=np.uint8),
+        np.ones(10, dtype=np.uint8),
+    )
+    slices = np.array([[2, 5, 1], [7, 9, 1], [4, 4, 1]], dtype=np.uint32)
+
+    @nb.njit
+    def nb_wrapper(container, slices):
+        return container.slice(slices)
+
+    for sliced in [slice_manual(container, slices), nb_wrapper(container, slices)]:
+        assert len(sliced) == 5
+        assert np.allclose(sliced.mz, [102, 103, 104, 107, 108])
+        assert np.all(sliced.type == [2, 3, 4, 7, 8])
+        assert np.all(sliced.precursor_idx == [0, 0, 0, 1, 1])
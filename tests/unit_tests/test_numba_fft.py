@@ -2,10 +2,17 @@ import pytest
 import numpy as np
 import numba as nb
 
-from alphadia.numba.fft import rfft2, irfft2, convolve_fourier
+from alphadia.numba.fft import (
+    rfft2,
+    irfft2,
+    convolve_fourier,
+    convolve_separable,
+)
 
 
-@pytest.mark.parametrize("shape", [(100, 2), (2, 100), (100, 100)])
+@pytest.mark.parametrize(
+    "shape", [(100, 2), (2, 100), (100, 100), (10, 100, 2), (2, 10, 100, 100)]
+)
 def test_rfft2_np_agreement(shape, tol=1e-6):
     @nb.njit
     def njit_rfft2(x):
@@ -17,7 +24,9 @@ def test_rfft2_np_agreement(shape, tol=1e-6):
     assert np.allclose(y, y2, atol=1e-3)
 
 
-@pytest.mark.parametrize("shape", [(128, 128), (2, 2), (128, 2), (2, 2)])
+@pytest.mark.parametrize(
+    "shape", [(128, 128), (2, 2), (128, 2), (2, 2), (10, 128, 2), (2, 10, 128, 128)]
+)
 def test_irfft2_np_agreement(shape, tol=1e-6):
     @nb.njit
     def njit_r2r(x):
@@ -112,3 +121,74 @@ def test_convolve_fourier_typing(shape, kernel_shape, should_fail):
 
     else:
         nb_wrapper(dense, filter)
+
+
+@pytest.mark.parametrize("shape", [(128, 128), (10, 128, 128), (2, 10, 128, 128)])
+def test_convolve_fourier_precomputed_filter(shape):
+    dense = np.random.rand(*shape).astype(np.float32)
+    kernel = np.random.rand(20, 20).astype(np.float32)
+
+    @nb.njit
+    def nb_wrapper(dense, kernel):
+        fourier_filter = rfft2(kernel, dense.shape[-2:])
+        return convolve_fourier(dense, kernel), convolve_fourier(
+            dense, kernel, fourier_filter
+        )
+
+    y1, y2 = nb_wrapper(dense, kernel)
+    assert np.allclose(y1, y2, atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "shape, kernel_shape",
+    [
+        ((128, 128), (20, 20)),
+        ((10, 2, 64), (2, 30)),
+        ((2, 10, 40, 32), (31, 29)),
+    ],
+)
+def test_convolve_separable_fourier_agreement(shape, kernel_shape):
+    dense = np.random.rand(*shape).astype(np.float32)
+    kernel_0 = np.random.rand(kernel_shape[0]).astype(np.float32)
+    kernel_1 = np.random.rand(kernel_shape[1]).astype(np.float32)
+    kernel = np.outer(kernel_0, kernel_1).astype(np.float32)
+
+    @nb.njit
+    def nb_wrapper(dense, kernel):
+        return convolve_fourier(dense, kernel)
+
+    y1 = nb_wrapper(dense, kernel)
+    y2 = convolve_separable(dense, kernel_0, kernel_1)
+
+    assert y1.shape == y2.shape
+    assert np.allclose(y1, y2, rtol=1e-4, atol=1e-3)
+
+
+def test_convolve_empty_layers():
+    dense = np.random.rand(2, 5, 64, 48).astype(np.float32)
+    dense[:, 1] = 0
+    dense[1, 3] = 0
+    kernel_0 = np.random.rand(10).astype(np.float32)
+    kernel_1 = np.random.rand(12).astype(np.float32)
+    kernel = np.outer(kernel_0, kernel_1).astype(np.float32)
+
+    @nb.njit
+    def nb_wrapper(dense, kernel):
+        return convolve_fourier(dense, kernel)
+
+    y_fourier = nb_wrapper(dense, kernel)
+    y_separable = convolve_separable(dense, kernel_0, kernel_1)
+
+    for y in [y_fourier, y_separable]:
+        assert y.shape == dense.shape
+        assert np.all(y[:, 1] == 0)
+        assert np.all(y[1, 3] == 0)
+
+    for i in range(dense.shape[0]):
+        for j in range(dense.shape[1]):
+            assert np.allclose(
+                y_fourier[i, j], nb_wrapper(dense[i, j], kernel), atol=1e-6
+            )
+
+    # all layers empty
+    assert np.all(nb_wrapper(np.zeros_like(dense), kernel) == 0)
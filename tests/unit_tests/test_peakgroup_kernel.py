@@ -64,3 +64,28 @@ def test_gaussian_kernel(has_mobility, kernel_height, kernel_width, cycle_shape)
     assert np.all(~np.isnan(mat))
 
     assert mat.dtype == np.float32
+
+
+@pytest.mark.parametrize(
+    "size_x, size_y, sigma_x, sigma_y",
+    [
+        (10, 10, 1.0, 1.0),
+        (12, 4, 5.3, 1.0),
+        (30, 30, 2.5, 12.0),
+    ],
+)
+def test_gaussian_kernel_2d(size_x, size_y, sigma_x, sigma_y):
+    x, y = np.meshgrid(
+        np.arange(-size_x // 2, size_x // 2), np.arange(-size_y // 2, size_y // 2)
+    )
+    xy = np.column_stack((x.flatten(), y.flatten())).astype("float32")
+    sigma_mat = np.array([[sigma_x, 0.0], [0.0, sigma_y]])
+    reference = multivariate_normal(xy, np.array([[0.0, 0.0]]), sigma_mat).reshape(
+        size_y, size_x
+    )
+
+    mat = GaussianKernel.gaussian_kernel_2d(size_x, size_y, sigma_x, sigma_y)
+
+    assert mat.shape == (size_y, size_x)
+    assert mat.dtype == np.float32
+    assert np.allclose(mat, reference, rtol=1e-5, atol=1e-8)
@@ -0,0 +1,37 @@
+import numpy as np
+import numba as nb
+
+from alphadia.numba.fft import convolve_fourier
+from alphadia.peakgroup.search import build_fourier_filter, select_fourier_filter
+
+
+def test_select_fourier_filter_reuses_precomputed_filter():
+    kernel = np.random.rand(20, 20).astype(np.float32)
+    fourier_filter = build_fourier_filter(kernel, (64, 128))
+
+    selected = select_fourier_filter(kernel, fourier_filter, (64, 128), (64, 128))
+    assert selected.shape == fourier_filter.shape
+    assert np.array_equal(selected, fourier_filter)
+
+
+def test_select_fourier_filter_mismatched_shape():
+    # precursor and fragment matrices with different dimensions are both convolved with their own filter
+    kernel = np.random.rand(20, 20).astype(np.float32)
+    fourier_filter = build_fourier_filter(kernel, (64, 128))
+
+    dense_precursors = np.random.rand(2, 3, 1, 64, 128).astype(np.float32)
+    dense_fragments = np.random.rand(2, 6, 2, 64, 96).astype(np.float32)
+
+    @nb.njit
+    def nb_wrapper(dense, kernel, fourier_filter, fourier_filter_shape):
+        selected = select_fourier_filter(
+            kernel, fourier_filter, fourier_filter_shape, dense.shape[-2:]
+        )
+        return convolve_fourier(dense, kernel), convolve_fourier(
+            dense, kernel, selected
+        )
+
+    for dense in [dense_precursors, dense_fragments]:
+        y1, y2 = nb_wrapper(dense, kernel, fourier_filter, (64, 128))
+        assert y2.shape == dense.shape
+        assert np.allclose(y1, y2, atol=1e-6)
@@ -23,3 +23,15 @@ def test_assemble_isotope_mz(should_fail, mz, charge, intensities):
             wrap_assemble_isotope_mz(mz, charge, intensities)
     else:
         wrap_assemble_isotope_mz(mz, charge, intensities)
+
+
+@pytest.mark.parametrize("charge", [1, 2, 3])
+def test_assemble_isotope_mz_values(charge):
+    mz = np.float32(500.3)
+    intensities = np.ones(4, dtype=np.float32)
+    isotope_mz = wrap_assemble_isotope_mz(mz, charge, intensities)
+
+    expected = (mz + np.arange(4) * 1.0033548350700006 / charge).astype(np.float32)
+
+    assert isotope_mz.dtype == np.float32
+    assert np.array_equal(isotope_mz, expected)
@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alphadia.workflow import peptidecentric
+
+
+def create_workflow(precursor_df, batch_size):
+    workflow = peptidecentric.PeptideCentricWorkflow.__new__(
+        peptidecentric.PeptideCentricWorkflow
+    )
+    workflow._config = {"calibration": {"batch_size": batch_size}}
+    workflow._spectral_library = SimpleNamespace(
+        _precursor_df=precursor_df, precursor_df=precursor_df
+    )
+    return workflow
+
+
+def reference_batch_plan(n_eg, batch_size):
+    plan = []
+    step = 0
+    start_index = 0
+
+    while start_index < n_eg:
+        stop_index = min(start_index + 2**step * batch_size, n_eg)
+        plan.append((start_index, stop_index))
+        step += 1
+        start_index = stop_index
+
+    return plan
+
+
+@pytest.mark.parametrize(
+    "n_eg, batch_size",
+    [
+        (0, 100),
+        (1, 100),
+        (99, 100),
+        (100, 100),
+        (300, 100),
+        (700, 100),
+        ((2**20 - 1) * 3, 3),
+        ((2**40 - 1) * 7, 7),
+        (301, 100),
+        (12345, 100),
+        (8000, 8000),
+    ],
+)
+def test_get_batch_plan(n_eg, batch_size):
+    # the plan only depends on the number of unique elution groups
+    elution_group_idx = SimpleNamespace(nunique=lambda: n_eg)
+    workflow = create_workflow({"elution_group_idx": elution_group_idx}, batch_size)
+
+    assert workflow.get_batch_plan() == reference_batch_plan(n_eg, batch_size)
+
+
+@pytest.mark.parametrize("n_eg, batch_size", [(1, 10), (57, 10), (700, 100)])
+def test_get_batch_df(n_eg, batch_size):
+    # every elution group is present in three channels and the library is not ordered by elution group
+    rng = np.random.default_rng(42)
+    elution_group_idx = rng.permutation(np.repeat(np.arange(n_eg) * 3 + 5, 3))
+    precursor_df = pd.DataFrame(
+        {
+            "precursor_idx": np.arange(len(elution_group_idx)),
+            "elution_group_idx": elution_group_idx,
+            "channel": np.tile([0, 4, 8], n_eg),
+        }
+    )
+    workflow = create_workflow(precursor_df, batch_size)
+
+    elution_group_order = precursor_df["elution_group_idx"].unique()
+    rng.shuffle(elution_group_order)
+    workflow.elution_group_position = workflow.get_elution_group_position(
+        elution_group_order
+    )
+
+    selected = []
+    for start_index, stop_index in workflow.get_batch_plan():
+        batch_df = workflow.get_batch_df(start_index, stop_index)
+        reference_df = precursor_df[
+            precursor_df["elution_group_idx"].isin(
+                elution_group_order[start_index:stop_index]
+            )
+        ]
+
+        assert np.array_equal(
+            batch_df["precursor_idx"].values, reference_df["precursor_idx"].values
+        )
+        selected.append(batch_df["precursor_idx"].values)
+
+    # every precursor is selected in exactly one batch
+    assert np.array_equal(
+        np.sort(np.concatenate(selected)), precursor_df["precursor_idx"].values
+    )
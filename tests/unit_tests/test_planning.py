@@ -1,9 +1,11 @@
 import tempfile
 import pytest
 import os
+import pandas as pd
 from alphadia import planning
 from alphadia.test_data_downloader import DataShareDownloader
 from alphabase.constants import _const
+from alphabase.spectral_library.base import SpecLibBase
 
 
 @pytest.mark.slow
@@ -70,3 +72,35 @@ def test_library_loading():
         plan = planning.Plan(temp_directory, library_path=test_data_location)
         assert len(plan.spectral_library.precursor_df) > 0
         assert len(plan.spectral_library.fragment_df) > 0
+
+
+@pytest.mark.slow
+def test_keep_base_in_memory():
+    common_contaminants = os.path.join(_const.CONST_FILE_FOLDER, "contaminants.fasta")
+    tempdir = tempfile.mkdtemp()
+    plan = planning.Plan(
+        tempdir,
+        fasta_path_list=[common_contaminants],
+        config={
+            "library_prediction": {"predict": True},
+            "library_loading": {"keep_base_in_memory": True},
+        },
+    )
+
+    base_spec_lib = plan._base_spec_lib
+    assert base_spec_lib is not None
+    assert base_spec_lib is not plan.spectral_library
+
+    reloaded_spec_lib = SpecLibBase()
+    reloaded_spec_lib.load_hdf(os.path.join(tempdir, "speclib.hdf"), load_mod_seq=True)
+
+    # the prepare pipeline has added decoys to the search library, the base library is unchanged
+    assert len(plan.spectral_library.precursor_df) > len(base_spec_lib.precursor_df)
+    for df_name in ["precursor_df", "fragment_mz_df", "fragment_intensity_df"]:
+        base_df = getattr(base_spec_lib, df_name)
+        reloaded_df = getattr(reloaded_spec_lib, df_name)
+        pd.testing.assert_frame_equal(
+            base_df.reset_index(drop=True),
+            reloaded_df[base_df.columns].reset_index(drop=True),
+            check_dtype=False,
+        )
@@ -12,6 +12,9 @@ from alphadia.utils import (
     windows_to_wsl,
     merge_missing_columns,
     get_torch_device,
+    find_peaks_1d,
+    find_peaks_2d,
+    candidate_hash,
 )
 
 
@@ -50,6 +53,18 @@ def test_amean1():
     assert np.allclose(numba_mean, np_mean)
 
 
+def test_candidate_hash():
+    precursor_idx = np.array([0, 1, 2**32 - 1], dtype=np.uint32)
+    rank = np.array([0, 3, 255], dtype=np.uint8)
+
+    candidate_idx = candidate_hash(precursor_idx, rank)
+
+    assert candidate_idx.dtype == np.int64
+    assert np.array_equal(
+        candidate_idx, precursor_idx.astype(np.int64) + rank.astype(np.int64) * 2**32
+    )
+
+
 def test_score_groups():
     sample_df = pd.DataFrame(
         {
@@ -156,3 +171,35 @@ def test_merge_missing(left_and_right_df):
     df = merge_missing_columns(left_df, right_df, ["col_3"], on="idx")
     # then
     assert np.all(df.columns == ["idx", "col_1", "col_2", "col_3"])
+
+
+def test_find_peaks_1d():
+    a = np.zeros((1, 20), dtype=np.float32)
+    a[0, 3:8] = [1, 2, 5, 2, 1]
+    a[0, 11:16] = [1, 2, 3, 2, 1]
+
+    scan, dia_cycle, intensity = find_peaks_1d(a, top_n=3)
+
+    assert np.array_equal(scan, [0, 0])
+    assert np.array_equal(dia_cycle, [5, 13])
+    assert np.allclose(intensity, [5, 3])
+    assert intensity.dtype == np.float32
+
+    scan, dia_cycle, intensity = find_peaks_1d(np.zeros((1, 3), dtype=np.float32))
+    assert len(scan) == len(dia_cycle) == len(intensity) == 0
+
+
+def test_find_peaks_2d():
+    x = np.arange(-10, 10)
+    a = np.exp(-((x[:, None] + 3) ** 2 + (x[None, :] - 2) ** 2) / 4).astype(np.float32)
+    a += 0.5 * np.exp(-((x[:, None] - 4) ** 2 + (x[None, :] + 5) ** 2) / 4)
+
+    scan, dia_cycle, intensity = find_peaks_2d(a, top_n=1)
+
+    assert np.array_equal(scan, [7])
+    assert np.array_equal(dia_cycle, [12])
+    assert len(intensity) == 1
+
+    scan, dia_cycle, intensity = find_peaks_2d(a, top_n=3)
+    assert np.array_equal(scan, [7, 14])
+    assert np.array_equal(dia_cycle, [12, 5])